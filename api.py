@@ -1,20 +1,55 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Query, Depends
+from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Query, Depends, Response, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
-import uvicorn
+from typing import Optional, List, Dict, Any, Union
+from collections import deque
+from contextlib import asynccontextmanager
 from main import ResearchAgent
 import time
 import json
-import os
-from io import BytesIO
+import asyncio
 
+from config import Config
+from utils.executor import BoundedExecutor, ExecutorSaturated
+from utils.history_store import open_history_store
+from utils.lazy import Lazy
+from utils.metrics import metrics, trace
 from utils.pdf_parser import PDFParser
+from utils.research_jobs import ResearchJobManager, open_job_store
+
+# Worker pools that keep blocking work off the event loop
+io_executor = Lazy(lambda: BoundedExecutor("io", Config.IO_WORKERS, Config.IO_QUEUE_LIMIT, kind='thread'))
+cpu_executor = Lazy(lambda: BoundedExecutor("cpu", Config.CPU_WORKERS, Config.CPU_QUEUE_LIMIT, kind='process'))
+
+# Global components, each created on first use so importing the app and
+# booting a worker stay cheap no matter how large the history grows
+research_agent = Lazy(lambda: ResearchAgent(summary_pool=cpu_executor))
+pdf_parser = Lazy(lambda: PDFParser(process_pool=cpu_executor))
+
+# History of research results (SQLite or Redis, shared by every worker), opened on demand
+history_store = Lazy(open_history_store)
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # Release only what this worker actually started
+    if research_agent.created:
+        research_agent.close()
+    if history_store.created:
+        history_store.close()
+    if research_jobs.created:
+        research_jobs.store.close()
+    for executor in (io_executor, cpu_executor):
+        if executor.created:
+            executor.shutdown(wait=False)
 
 app = FastAPI(
     title="Research Agent API",
     description="API for AI-powered research and text summarization",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -26,27 +61,15 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-# Create global instances
-research_agent = ResearchAgent()
-pdf_parser = PDFParser()
-
-# History of research results
-research_history = []
-history_file = 'research_history.json'
-
-# Load research history if file exists
-if os.path.exists(history_file):
-    try:
-        with open(history_file, 'r') as f:
-            research_history = json.load(f)
-    except:
-        research_history = []
-
 # Pydantic models for request/response validation
 class ResearchRequest(BaseModel):
     topic: str
     depth: int = 2
 
+class BatchResearchRequest(BaseModel):
+    topics: List[str]
+    depth: int = 2
+
 class PromptRequest(BaseModel):
     prompt: str
     depth: int = 2
@@ -55,20 +78,31 @@ class SummarizeRequest(BaseModel):
     text: str
     max_sentences: int = 3
 
+class BatchSummarizeRequest(BaseModel):
+    texts: List[str]
+    max_sentences: int = Field(3, ge=1)
+
 class ResearchResult(BaseModel):
     topic: str
     source: str
     summary: str
     timestamp: float
+    truncated: bool = False
 
-class HistoryEntry(BaseModel):
+class HistorySummary(BaseModel):
     id: int
     topic: str
     timestamp: float
     result_count: int
-    results: List[ResearchResult]
     prompt: Optional[str] = None
 
+class HistoryEntry(HistorySummary):
+    results: List[ResearchResult]
+
+class StageTiming(BaseModel):
+    count: int
+    seconds: float
+
 class ResearchResponse(BaseModel):
     research_id: int
     topic: str
@@ -76,6 +110,33 @@ class ResearchResponse(BaseModel):
     result_count: int
     processing_time: float
     prompt: Optional[str] = None
+    timings: Optional[Dict[str, StageTiming]] = None
+
+class TopicInfo(BaseModel):
+    topic: str
+    count: int
+    last_researched: float
+
+class ResearchJobResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    events_url: str
+
+class ResearchJobStatus(BaseModel):
+    job_id: str
+    status: str
+    topic: str
+    prompt: Optional[str] = None
+    depth: int
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    total_sources: Optional[int] = None
+    completed_sources: int
+    results: List[Dict[str, Any]]
+    research_id: Optional[int] = None
+    error: Optional[str] = None
 
 class SummaryResponse(BaseModel):
     original_length: int
@@ -91,23 +152,114 @@ class PDFResponse(BaseModel):
 class ErrorResponse(BaseModel):
     error: str
 
+# Pool tasks resolve the lazy components inside the worker, so the first
+# request never imports numpy/scipy or opens the caches on the event loop
+def summarize(text, max_sentences=3):
+    return research_agent.processor.summarize(text, max_sentences)
+
+def summarize_batch_texts(texts, max_sentences=3):
+    return research_agent.processor.summarize_batch(texts, max_sentences)
+
+def parse_pdf(file_stream):
+    return pdf_parser.parse_pdf(file_stream)
+
+def service_unavailable(error):
+    """Translate a saturated worker pool into a 503 with a retry hint."""
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": "5"})
+
+def run_research(topic, depth, prompt=None, on_result=None, timings=False):
+    """
+    Run a research call, store it in the history and build the API response.
+    
+    This is blocking and is meant to be executed in the I/O worker pool.
+    ``on_result`` is forwarded to ResearchAgent.research for per-source progress.
+    With ``timings`` the response includes the time spent in each pipeline stage.
+    """
+    with trace() as spans:
+        response = _run_research(topic, depth, prompt, on_result)
+    if timings:
+        response['timings'] = spans.breakdown()
+    return response
+
+def _run_research(topic, depth, prompt, on_result):
+    # Perform the research
+    start_time = time.time()
+    results = research_agent.research(topic, depth, on_result=on_result)
+    end_time = time.time()
+    return save_research(topic, results, prompt, end_time - start_time)
+
+def save_research(topic, results, prompt, processing_time):
+    """Store one topic's research results in the history and build its response."""
+    # Format the results
+    formatted_results = []
+    for item in results:
+        formatted_results.append({
+            'topic': item['topic'],
+            'source': item['source'],
+            'summary': item['summary'],
+            'timestamp': item['timestamp'],
+            'truncated': item.get('truncated', False)
+        })
+    
+    # Save to history
+    history_entry = history_store.append(
+        topic=topic,
+        timestamp=time.time(),
+        results=formatted_results,
+        prompt=prompt
+    )
+    
+    # Return the results
+    response = {
+        'research_id': history_entry['id'],
+        'topic': topic,
+        'results': formatted_results,
+        'result_count': len(formatted_results),
+        'processing_time': round(processing_time, 2)
+    }
+    if prompt is not None:
+        response['prompt'] = prompt
+    return response
+
+# Background research jobs share the I/O pool and land in the history when done
+research_jobs = Lazy(lambda: ResearchJobManager(
+    io_executor, run_research, open_job_store(), retention=Config.RESEARCH_JOB_RETENTION
+))
+
 @app.get("/api/health", tags=["Health"])
 async def health_check():
     """Check if the API is healthy and running."""
-    return {"status": "healthy", "service": "research-agent-api"}
+    return {
+        "status": "healthy",
+        "service": "research-agent-api",
+        "workers": {"io": io_executor.stats(), "cpu": cpu_executor.stats()},
+        "research_coalescing": research_agent.flight.stats()
+    }
+
+@app.get("/api/metrics", response_class=PlainTextResponse, tags=["Health"])
+async def get_metrics():
+    """Per-stage latency histograms in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/scraper/stats", tags=["Health"])
+async def scraper_stats():
+    """Get per-host request counters from the web scraper."""
+    return research_agent.scraper.stats()
 
 @app.get("/api/research", response_model=ResearchResponse, tags=["Research"])
 @app.post("/api/research", response_model=ResearchResponse, tags=["Research"])
 async def perform_research(
     research_req: Optional[ResearchRequest] = None,
     topic: Optional[str] = Query(None, description="Research topic"),
-    depth: int = Query(2, description="Search depth (number of sources to analyze)")
+    depth: int = Query(2, description="Search depth (number of sources to analyze)"),
+    timings: bool = Query(False, description="Include the time spent in each pipeline stage")
 ):
     """
     Perform research on a given topic.
     
     - **topic**: Topic to research
     - **depth**: Number of sources to analyze (default: 2)
+    - **timings**: Include a per-stage timing breakdown in the response
     """
     # For POST requests with body parameters
     if research_req is not None:
@@ -125,80 +277,226 @@ async def perform_research(
     print(f"API received research  request for topic: '{research_topic}'")
     
     try:
-        # Perform the research
-        start_time = time.time()
-        results = research_agent.research(research_topic, research_depth)
-        end_time = time.time()
-        
-        # Format the results
-        formatted_results = []
-        for item in results:
-            formatted_results.append({
-                'topic': item['topic'],
-                'source': item['source'],
-                'summary': item['summary'],
-                'timestamp': item['timestamp']
-            })
-
-        # Save to history
-        history_entry = {
-            'id': len(research_history) + 1,
-            'topic': research_topic,
-            'timestamp': time.time(),
-            'result_count': len(formatted_results),
-            'results': formatted_results
-        }
-        research_history.append(history_entry)                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                  
-        
-        # Save history to file
-        with open(history_file, 'w') as f:
-            json.dump(research_history, f)
-        
-        # Return the results
-        return {
-            'research_id': history_entry['id'],
-            'topic': research_topic,
-            'results': formatted_results,
-            'result_count': len(formatted_results),
-            'processing_time': round(end_time - start_time, 2)
-        }
+        return await io_executor.run(run_research, research_topic, research_depth, timings=timings)
     
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
     except Exception as e:
         print(f"Error performing research: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/history", response_model=List[HistoryEntry], tags=["History"])
-async def get_history():
-    """Get the complete research history."""
-    return research_history
+@app.post("/api/research/batch", tags=["Research"])
+async def research_batch(batch_req: BatchResearchRequest):
+    """
+    Research many topics in one call and stream each topic's results as NDJSON.
+    
+    Topics are searched first and the union of their sources is fetched and
+    summarized once, so a URL shared by several topics costs a single fetch.
+    Each output line `{"index", "topic", "research_id", "results",
+    "result_count", "processing_time"}` is streamed as soon as all sources of
+    that topic are done, in completion order; every topic is also stored in
+    the history like a single research call.
+    """
+    topics = [topic.strip() for topic in batch_req.topics]
+    if not topics or any(topic == "" or topic == "string" for topic in topics):
+        raise HTTPException(status_code=400, detail="Missing or invalid topic in request body")
+    if len(topics) > Config.RESEARCH_BATCH_MAX_TOPICS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many topics, at most {Config.RESEARCH_BATCH_MAX_TOPICS} per batch"
+        )
+    
+    print(f"API received batch research request for {len(topics)} topics")
+    
+    loop = asyncio.get_running_loop()
+    lines = asyncio.Queue()
+    
+    def emit(line):
+        loop.call_soon_threadsafe(lines.put_nowait, line)
+    
+    def run_batch():
+        # Runs in the I/O pool; every finished topic is pushed to the stream
+        start_time = time.time()
+        
+        def on_topic(index, topic, results):
+            try:
+                response = save_research(topic, results, None, time.time() - start_time)
+                emit(json.dumps(dict(response, index=index)) + "\n")
+            except Exception as e:
+                print(f"Error saving batch research for '{topic}': {str(e)}")
+                emit(json.dumps({'index': index, 'topic': topic, 'error': str(e)}) + "\n")
+        
+        try:
+            research_agent.research_batch(topics, batch_req.depth, on_topic=on_topic)
+        except Exception as e:
+            print(f"Error performing batch research: {str(e)}")
+            emit(json.dumps({'error': str(e)}) + "\n")
+        finally:
+            emit(None)
+    
+    # Submitted before the response starts, so a saturated pool is still a 503
+    try:
+        io_executor.submit(run_batch)
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
+    
+    async def generate():
+        while True:
+            line = await lines.get()
+            if line is None:
+                return
+            yield line
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+# Job state lives in the shared job store, so the job routes are plain
+# functions (run in the threadpool) and any worker can answer for any job
+@app.post("/api/research/jobs", response_model=ResearchJobResponse, status_code=202, tags=["Research"])
+def create_research_job(research_req: ResearchRequest):
+    """
+    Start research in the background and return a job ID immediately.
+    
+    Poll **status_url** for progress or subscribe to **events_url**
+    (Server-Sent Events) to receive each source's summary as it completes.
+    """
+    if not research_req.topic or research_req.topic.strip() == "" or research_req.topic.strip() == "string":
+        raise HTTPException(status_code=400, detail="Missing or invalid topic parameter in request body")
+    
+    try:
+        job = research_jobs.submit(research_req.topic.strip(), research_req.depth)
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
+    
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f"/api/research/jobs/{job.id}",
+        'events_url': f"/api/research/jobs/{job.id}/events"
+    }
+
+@app.get("/api/research/jobs/{job_id}", response_model=ResearchJobStatus, tags=["Research"])
+def get_research_job(job_id: str):
+    """Get the status and the results gathered so far for a research job."""
+    job = research_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Research job not found")
+    return job
+
+@app.get("/api/research/jobs/{job_id}/events", tags=["Research"])
+async def stream_research_job(job_id: str):
+    """
+    Stream a research job's progress as Server-Sent Events.
+    
+    Events: `status`, `result` (one per source, in completion order),
+    then `done` with the research ID or `error`.
+    """
+    if await run_in_threadpool(lambda: research_jobs.get(job_id)) is None:
+        raise HTTPException(status_code=404, detail="Research job not found")
+    
+    async def generate():
+        position = 0
+        while True:
+            events, done = await run_in_threadpool(lambda: research_jobs.events_since(job_id, position))
+            for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+            position += len(events)
+            if done and not events:
+                return
+            await asyncio.sleep(0.25)
+    
+    return StreamingResponse(generate(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+# The history handlers are plain functions: Starlette runs them in its
+# threadpool, so opening the store and waiting on its lock (or on Redis)
+# never blocks the event loop
+@app.get("/api/history", response_model=List[Union[HistoryEntry, HistorySummary]], tags=["History"])
+def get_history(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of entries to return"),
+    offset: int = Query(0, ge=0, description="Number of matching entries to skip"),
+    cursor: Optional[int] = Query(None, description="Return entries after this research ID (see X-Next-Cursor)"),
+    since: Optional[float] = Query(None, description="Only entries at or after this UNIX timestamp"),
+    until: Optional[float] = Query(None, description="Only entries at or before this UNIX timestamp"),
+    topic: Optional[str] = Query(None, description="Only entries for this exact topic"),
+    summary_only: bool = Query(False, description="Omit the per-source results")
+):
+    """
+    Get a page of the research history, oldest first.
+    
+    Use **cursor** with the value of the `X-Next-Cursor` response header to
+    fetch the next page; the header is absent on the last page.
+    """
+    entries = history_store.query(
+        limit=limit,
+        offset=offset,
+        after_id=cursor,
+        since=since,
+        until=until,
+        topic=topic,
+        include_results=not summary_only
+    )
+    if len(entries) == limit:
+        response.headers['X-Next-Cursor'] = str(entries[-1]['id'])
+    return entries
+
+@app.get("/api/history/export", tags=["History"])
+async def export_history(
+    since: Optional[float] = Query(None, description="Only entries at or after this UNIX timestamp"),
+    until: Optional[float] = Query(None, description="Only entries at or before this UNIX timestamp"),
+    topic: Optional[str] = Query(None, description="Only entries for this exact topic"),
+    summary_only: bool = Query(False, description="Omit the per-source results")
+):
+    """Stream the matching research history as NDJSON (one entry per line)."""
+    def generate():
+        for entry in history_store.iter_entries(
+            since=since,
+            until=until,
+            topic=topic,
+            include_results=not summary_only
+        ):
+            yield json.dumps(entry) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 @app.get("/api/history/{research_id}", response_model=HistoryEntry, tags=["History"])
-async def get_research_by_id(research_id: int):
+def get_research_by_id(research_id: int):
     """Get a specific research entry by its ID."""
-    for entry in research_history:
-        if entry['id'] == research_id:
-            return entry
+    entry = history_store.get(research_id)
+    if entry is not None:
+        return entry
     
     raise HTTPException(status_code=404, detail="Research not found")
 
-@app.get("/api/topics", response_model=List[str], tags=["Research"])
-async def get_topics():
-    """Get a list of all researched topics."""
-    topics = list(set(entry['topic'] for entry in research_history))
-    return topics
+@app.get("/api/topics", response_model=Union[List[TopicInfo], List[str]], tags=["Research"])
+def get_topics(
+    prefix: Optional[str] = Query(None, description="Only topics starting with this text (case-insensitive)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of topics to return"),
+    details: bool = Query(False, description="Include research counts and last-researched timestamps")
+):
+    """
+    Get the researched topics in alphabetical order.
+    
+    Use **prefix** with a small **limit** for typeahead/autocomplete.
+    """
+    topics = history_store.topics(prefix=prefix, limit=limit)
+    if details:
+        return topics
+    return [item['topic'] for item in topics]
 
 @app.get("/api/prompt", response_model=ResearchResponse, tags=["Research"])
 @app.post("/api/prompt", response_model=ResearchResponse, tags=["Research"])
 async def handle_prompt(
     prompt_req: Optional[PromptRequest] = None,
     prompt: Optional[str] = Query(None, description="Research prompt"),
-    depth: int = Query(2, description="Search depth (number of sources to analyze)")
+    depth: int = Query(2, description="Search depth (number of sources to analyze)"),
+    timings: bool = Query(False, description="Include the time spent in each pipeline stage")
 ):
     """
     Perform research based on a natural language prompt.
     
     - **prompt**: Natural language research prompt
     - **depth**: Number of sources to analyze (default: 2)
+    - **timings**: Include a per-stage timing breakdown in the response
     """
     # Handle GET requests
     if prompt_req is None:
@@ -215,48 +513,181 @@ async def handle_prompt(
         # Extract research topic from the prompt
         topic = research_prompt  # Simple approach - use prompt as topic
         
-        # Perform the research
+        return await io_executor.run(run_research, topic, research_depth, prompt=research_prompt, timings=timings)
+    
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/summarize", response_model=SummaryResponse, tags=["Content Processing"])
+async def summarize_text(summarize_req: SummarizeRequest):
+    """
+    Summarize a piece of text.
+    
+    - **text**: Text to summarize
+    - **max_sentences**: Maximum number of sentences in the summary (default: 3)
+    """
+    if summarize_req.max_sentences < 1:
+        raise HTTPException(status_code=400, detail="max_sentences must be at least 1")
+    
+    try:
         start_time = time.time()
-        results = research_agent.research(topic, research_depth)
+        summary = await io_executor.run(
+            summarize,
+            summarize_req.text,
+            summarize_req.max_sentences
+        )
         end_time = time.time()
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
+    except Exception as e:
+        print(f"Error summarizing text: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        'original_length': len(summarize_req.text),
+        'summary': summary,
+        'summary_length': len(summary),
+        'processing_time': round(end_time - start_time, 2)
+    }
+
+async def iter_ndjson_texts(request):
+    """Yield the non-empty lines of an NDJSON request body as they arrive."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+def parse_batch_item(line):
+    """An NDJSON item is either a JSON string or an object with a "text" field."""
+    item = json.loads(line)
+    return item['text'] if isinstance(item, dict) else str(item)
+
+@app.post("/api/summarize/batch", tags=["Content Processing"])
+async def summarize_batch(
+    request: Request,
+    max_sentences: Optional[int] = Query(None, ge=1, description="Maximum sentences per summary (default: 3)")
+):
+    """
+    Summarize many texts in one call and stream the results back as NDJSON.
+    
+    Send either a JSON body `{"texts": [...], "max_sentences": 3}` or an
+    `application/x-ndjson` body with one text per line (a JSON string or
+    `{"text": "..."}`). Texts are summarized in chunks by the worker pool and
+    each output line `{"index", "summary", "original_length", "summary_length"}`
+    is streamed back in input order as soon as its chunk is done. An explicit
+    **max_sentences** query parameter takes precedence over the JSON body.
+    """
+    # The body is read before the response starts: once a StreamingResponse is
+    # running, the server listens for client disconnects on the same channel
+    if 'ndjson' in request.headers.get('content-type', ''):
+        items = []
+        async for line in iter_ndjson_texts(request):
+            try:
+                items.append((parse_batch_item(line), None))
+            except (ValueError, KeyError, TypeError) as e:
+                items.append((None, f"Invalid NDJSON line: {str(e)}"))
+    else:
+        try:
+            batch_req = BatchSummarizeRequest(**(await request.json()))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid batch request: {str(e)}")
+        items = [(text, None) for text in batch_req.texts]
+        if max_sentences is None:
+            max_sentences = batch_req.max_sentences
+    if max_sentences is None:
+        max_sentences = 3
+    
+    chunks = [items[start:start + Config.SUMMARY_BATCH_SIZE] for start in range(0, len(items), Config.SUMMARY_BATCH_SIZE)]
+    
+    def submit_now(chunk_items):
+        texts = [text or "" for text, _ in chunk_items]
+        return asyncio.wrap_future(io_executor.submit(summarize_batch_texts, texts, max_sentences)), chunk_items
+    
+    async def submit(chunk_items):
+        # Later chunks wait a bounded time for a free worker instead of failing a
+        # stream already under way; submit() runs here so saturation is seen at once
+        deadline = time.monotonic() + Config.SUMMARY_BATCH_MAX_WAIT
+        while True:
+            try:
+                return submit_now(chunk_items)
+            except ExecutorSaturated:
+                if time.monotonic() >= deadline:
+                    return None, chunk_items
+                await asyncio.sleep(0.1)
+    
+    # The first chunk is submitted before the response starts, so a saturated
+    # pool is still answered with a 503 and Retry-After
+    first = None
+    if chunks:
+        try:
+            first = submit_now(chunks[0])
+        except ExecutorSaturated as e:
+            raise service_unavailable(e)
+    
+    def format_results(start_index, chunk_items, summaries):
+        lines = []
+        for offset, ((text, error), summary) in enumerate(zip(chunk_items, summaries)):
+            if error is not None:
+                result = {'index': start_index + offset, 'error': error}
+            else:
+                result = {
+                    'index': start_index + offset,
+                    'summary': summary,
+                    'original_length': len(text),
+                    'summary_length': len(summary)
+                }
+            lines.append(json.dumps(result) + "\n")
+        return "".join(lines)
+    
+    async def generate():
+        in_flight = deque([first] if first is not None else [])
+        next_index = 0
         
-        # Format the results
-        formatted_results = []
-        for item in results:
-            formatted_results.append({
-                'topic': item['topic'],
-                'source': item['source'],
-                'summary': item['summary'],
-                'timestamp': item['timestamp']
-            })
-        
-        # Save to history
-        history_entry = {
-            'id': len(research_history) + 1,
-            'prompt': research_prompt,
-            'topic': topic,
-            'timestamp': time.time(),
-            'result_count': len(formatted_results),
-            'results': formatted_results
-        }
-        research_history.append(history_entry)
-        
-        # Save history to file
-        with open(history_file, 'w') as f:
-            json.dump(research_history, f)
+        async def drain_one():
+            nonlocal next_index
+            task, chunk_items = in_flight.popleft()
+            error = 'Summarization failed'
+            if task is None:
+                summaries = None
+                error = 'The worker pool stayed saturated, please retry'
+            else:
+                try:
+                    summaries = await task
+                except Exception as e:
+                    summaries = None
+                    print(f"Error in batch summarization: {str(e)}")
+            if summaries is None:
+                output = "".join(
+                    json.dumps({'index': next_index + i, 'error': error}) + "\n"
+                    for i in range(len(chunk_items))
+                )
+            else:
+                output = format_results(next_index, chunk_items, summaries)
+            next_index += len(chunk_items)
+            return output
         
-        # Return the results
-        return {
-            'research_id': history_entry['id'],
-            'prompt': research_prompt,
-            'topic': topic,
-            'results': formatted_results,
-            'result_count': len(formatted_results),
-            'processing_time': round(end_time - start_time, 2)
-        }
+        for chunk_items in chunks[1:]:
+            if len(in_flight) >= Config.SUMMARY_BATCH_INFLIGHT:
+                yield await drain_one()
+            in_flight.append(await submit(chunk_items))
+        while in_flight:
+            yield await drain_one()
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+def upload_size(file):
+    """Return the size of an upload without reading it into memory."""
+    file.file.seek(0, 2)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
 
 @app.post("/api/pdf", response_model=PDFResponse, tags=["Content Processing"])
 async def process_pdf(file: UploadFile = File(...)):
@@ -278,17 +709,12 @@ async def process_pdf(file: UploadFile = File(...)):
         )
     
     try:
-        # Read the file content
-        contents = await file.read()
-        
-        # Check if file is empty
-        if len(contents) == 0:
+        # Check if file is empty (the upload is already spooled by the server)
+        if upload_size(file) == 0:
             raise HTTPException(status_code=400, detail="The PDF file appears to be empty")
-            
-        file_stream = BytesIO(contents)
         
-        # Process the PDF
-        pdf_content = pdf_parser.parse_pdf(file_stream)
+        # Process the PDF (text extraction itself runs in the CPU process pool)
+        pdf_content = await io_executor.run(parse_pdf, file.file)
         
         # Check if content was successfully extracted
         if not pdf_content or pdf_content.startswith("Error extracting text:"):
@@ -299,7 +725,7 @@ async def process_pdf(file: UploadFile = File(...)):
             )
         
         # Generate summary using the AI processor
-        summary = research_agent.processor.summarize(pdf_content)
+        summary = await io_executor.run(summarize, pdf_content)
         
         # Prepare the response
         content_sample = pdf_content[:500] + "..." if len(pdf_content) > 500 else pdf_content
@@ -310,6 +736,10 @@ async def process_pdf(file: UploadFile = File(...)):
             'summary': summary
         }
         
+    except HTTPException:
+        raise
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
     except Exception as e:
         # Log the error (you might want to use a proper logging system)
         print(f"Error processing PDF: {str(e)}")
@@ -318,3 +748,57 @@ async def process_pdf(file: UploadFile = File(...)):
             detail=f"Error processing PDF: {str(e)}"
         )
     
+
+@app.post("/api/pdf/pages", tags=["Content Processing"])
+async def stream_pdf_pages(file: UploadFile = File(...)):
+    """
+    Extract a PDF page by page and stream the text as NDJSON.
+    
+    Each line is `{"page": <1-based number>, "text": "..."}`; pages are
+    extracted in parallel but always emitted in order.
+    """
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=400, 
+            detail="Invalid file format. Only PDF files are accepted."
+        )
+    if upload_size(file) == 0:
+        raise HTTPException(status_code=400, detail="The PDF file appears to be empty")
+    
+    def page_lines():
+        try:
+            for page_num, page_text in enumerate(pdf_parser.iter_pages(file.file), start=1):
+                yield json.dumps({'page': page_num, 'text': page_text}) + "\n"
+        except Exception as e:
+            print(f"Error streaming PDF pages: {str(e)}")
+            yield json.dumps({'error': f"Error processing PDF: {str(e)}"}) + "\n"
+    
+    # Extraction is pulled through the I/O pool one page at a time; the first
+    # page is requested before the response starts, so a saturated pool is a 503
+    lines = page_lines()
+    try:
+        pull = io_executor.submit(next, lines, None)
+    except ExecutorSaturated as e:
+        lines.close()
+        raise service_unavailable(e)
+    
+    async def generate():
+        nonlocal pull
+        try:
+            while True:
+                line = await asyncio.wrap_future(pull)
+                if line is None:
+                    return
+                yield line
+                # Later pages wait for a free worker instead of failing a stream already sent
+                while True:
+                    try:
+                        pull = io_executor.submit(next, lines, None)
+                        break
+                    except ExecutorSaturated:
+                        await asyncio.sleep(0.1)
+        finally:
+            # The generator may still be running in the pool if the client went away
+            pull.add_done_callback(lambda _: lines.close())
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -0,0 +1,84 @@
+"""
+Benchmark the HTML extraction engines against the original implementation.
+
+Usage:
+    python benchmarks/bench_extraction.py [page.html ...] [--repeat N]
+
+Without arguments a synthetic Wikipedia-like page (navigation, table of
+contents, navboxes and footer around ~60 sections of text) is used.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.html_extractor import ENGINES, engine_available, get_extractor
+
+WORDS = (
+    "intelligence machine learning systems research computer data model neural network reasoning "
+    "knowledge planning language perception robotics search optimization logic probability statistics"
+).split()
+
+
+def synthetic_page(sections=60, paragraphs=6, seed=0):
+    """Build a large page whose article text is surrounded by typical page chrome."""
+    rng = random.Random(seed)
+
+    def sentence():
+        return ' '.join(rng.choices(WORDS, k=rng.randint(8, 20))).capitalize() + '.'
+
+    menu = ''.join(f'<li><a href="/wiki/{i}">Menu item {i}</a></li>' for i in range(400))
+    toc = ''.join(f'<li><a href="#s{i}">Section {i}</a></li>' for i in range(sections))
+    body = ''.join(
+        f'<h2 id="s{i}">Section {i}</h2>' + ''.join(
+            f'<p>{" ".join(sentence() for _ in range(5))} See <a href="/x">a related article</a>.</p>'
+            for _ in range(paragraphs)
+        )
+        for i in range(sections)
+    )
+    return (
+        '<!DOCTYPE html><html><head><title>Synthetic</title><style>.x{}</style><script>var a = 1;</script></head>'
+        f'<body><div id="mw-navigation"><nav class="vector-menu"><ul>{menu}</ul></nav></div>'
+        '<header class="vector-header">Main menu Search Donate Create account Log in</header>'
+        '<main id="content"><h1>Synthetic article</h1><div id="mw-content-text">'
+        f'<div class="toc"><ul>{toc}</ul></div>{body}<div class="navbox"><ul>{menu}</ul></div>'
+        f'</div></main><footer id="footer"><ul>{menu}</ul>Privacy policy</footer></body></html>'
+    )
+
+
+def bench(extractor, html, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = extractor.extract(html)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages', nargs='*', help='HTML files to benchmark (default: synthetic page)')
+    parser.add_argument('--repeat', type=int, default=10, help='runs per engine and page (default: 10)')
+    args = parser.parse_args()
+
+    pages = [(path, open(path, encoding='utf-8', errors='replace').read()) for path in args.pages]
+    if not pages:
+        pages = [('<synthetic>', synthetic_page())]
+
+    engines = [name for name in ENGINES if engine_available(name)]
+    for label, html in pages:
+        print(f"\n{label} ({len(html) / 1024:.0f} KB)")
+        print(f"{'engine':<12}{'median ms':>12}{'speedup':>10}{'chars out':>12}")
+        baseline = None
+        for name in ['legacy'] + [name for name in engines if name != 'legacy']:
+            median, text = bench(get_extractor(name), html, args.repeat)
+            baseline = baseline or median
+            print(f"{name:<12}{median * 1000:>12.1f}{baseline / median:>9.1f}x{len(text):>12}")
+
+
+if __name__ == '__main__':
+    main()
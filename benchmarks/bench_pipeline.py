@@ -0,0 +1,288 @@
+"""
+Offline benchmark of the research and PDF pipelines.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--repeat N] [--workers N] [--warm]
+                                        [--only CASE ...] [--output run.json]
+    python benchmarks/bench_pipeline.py --compare base.json new.json
+
+Cases run against the corpus from benchmarks/corpus.py (built on first use):
+
+    extract     WebScraper.extract_main_content on every HTML page
+    summarize   AIProcessor.summarize on every extracted page and on all of them joined
+    research    ResearchAgent.research over the corpus pages, served by a local HTTP server
+    pdf:N       PDFParser.parse_pdf on an N-page PDF
+
+Every case runs in its own subprocess so its peak RSS is measured in
+isolation. Caches are disabled unless --warm is given, so each operation
+does the full work. Save runs with --output and compare them with --compare.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import corpus
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CASES = ('extract', 'summarize', 'research') + tuple(f'pdf:{pages}' for pages in corpus.PDF_PAGES)
+
+
+def percentile(values, q):
+    """Linearly interpolated percentile of ``values`` (0 <= q <= 100)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _windows_peak_rss():
+    """Peak working set of this process in bytes, from GetProcessMemoryInfo."""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.PeakWorkingSetSize
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process (and waited-for children) in MiB.
+
+    On Windows only this process is counted (every case runs in its own
+    interpreter anyway); None where neither source is available.
+    """
+    if resource is None:
+        peak = _windows_peak_rss() if sys.platform == 'win32' else None
+        return peak / (1024 * 1024) if peak is not None else None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def configure(warm, cache_dir):
+    """Point the application at the local corpus and switch caches on or off."""
+    from config import Config
+
+    Config.HOST_MIN_INTERVAL = 0.0  # every corpus page lives on one local host
+    Config.TOPIC_CATALOG_PATH = os.path.join(cache_dir, 'topics.json')
+    Config.PAGE_CACHE_PATH = os.path.join(cache_dir, 'page_cache.sqlite3')
+    Config.PAGE_CACHE_ENABLED = warm
+    Config.CONTENT_CACHE_DISK_PATH = ''
+    if not warm:
+        Config.CONTENT_CACHE_MAX_BYTES = 0
+        Config.RESEARCH_RESULT_TTL = 0.0
+
+
+def operations(case, directory, workers, cache_dir, stack):
+    """Return ``(label, callable)`` pairs for one benchmark case."""
+    from utils.ai_processor import AIProcessor
+    from utils.executor import BoundedExecutor
+    from utils.pdf_parser import PDFParser
+    from utils.web_scrapper import WebScraper
+
+    pool = None
+    if workers:
+        pool = BoundedExecutor('bench', workers, workers * 4, kind='process')
+        stack.callback(pool.shutdown)
+
+    pages = {}
+    for path in corpus.html_files(directory):
+        with open(path, encoding='utf-8', errors='replace') as f:
+            pages[os.path.basename(path)] = f.read()
+
+    if case == 'extract':
+        scraper = WebScraper()
+        return [(name, lambda html=html: scraper.extract_main_content(html)) for name, html in pages.items()]
+
+    if case == 'summarize':
+        scraper = WebScraper()
+        processor = AIProcessor(pool=pool)
+        texts = {name: scraper.extract_main_content(html) for name, html in pages.items()}
+        texts['all-pages'] = '\n'.join(texts.values())
+        return [(name, lambda text=text: processor.summarize(text)) for name, text in texts.items()]
+
+    if case == 'research':
+        from main import ResearchAgent
+
+        base_url = stack.enter_context(corpus.serve(directory))
+        sources = [{'link': f"{base_url}/html/{name}", 'title': name} for name in pages]
+        with open(os.path.join(cache_dir, 'topics.json'), 'w', encoding='utf-8') as f:
+            json.dump({corpus.TOPIC: sources}, f)
+        agent = ResearchAgent(summary_pool=pool)
+        stack.callback(agent.scraper.close)
+        return [(corpus.TOPIC, lambda: agent.research(corpus.TOPIC, depth=len(sources)))]
+
+    if case.startswith('pdf:'):
+        path = os.path.join(directory, 'pdf', f"pages-{int(case.split(':', 1)[1]):04d}.pdf")
+        parser = PDFParser(process_pool=pool)
+        return [(os.path.basename(path), lambda: parser.parse_pdf(path))]
+
+    raise ValueError(f"Unknown case '{case}', expected one of {CASES}")
+
+
+def run_case(case, directory, repeat, workers, warm):
+    """Run one case in this process and return its measurements."""
+    with tempfile.TemporaryDirectory() as cache_dir, contextlib.ExitStack() as stack:
+        configure(warm, cache_dir)
+        # The application logs every step with print(); keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            ops = operations(case, directory, workers, cache_dir, stack)
+            latencies = []
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for _, operation in ops:
+                    op_start = time.perf_counter()
+                    operation()
+                    latencies.append(time.perf_counter() - op_start)
+            elapsed = time.perf_counter() - started
+
+    return {
+        'case': case,
+        'ops': len(latencies),
+        'seconds': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_isolated(case, args):
+    """Run a case in a fresh interpreter so its peak RSS is its own."""
+    command = [
+        sys.executable, os.path.abspath(__file__), '--case', case,
+        '--dir', args.dir, '--repeat', str(args.repeat), '--workers', str(args.workers),
+    ]
+    if args.warm:
+        command.append('--warm')
+    output = subprocess.run(command, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_mb(value):
+    return f"{value:.1f}" if value is not None else 'n/a'
+
+
+def print_table(results):
+    print(f"{'case':<12}{'ops':>6}{'ops/s':>10}{'p50 ms':>11}{'p99 ms':>11}{'peak RSS MB':>14}")
+    for row in results:
+        print(f"{row['case']:<12}{row['ops']:>6}{row['throughput']:>10.2f}{row['p50_ms']:>11.1f}"
+              f"{row['p99_ms']:>11.1f}{format_mb(row['peak_rss_mb']):>14}")
+
+
+def compare(base_path, new_path):
+    """Print per-case changes between two saved runs."""
+    with open(base_path, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+
+    def change(old, current):
+        if old is None or current is None:
+            return ''
+        return f"{(current - old) / old * 100:+.1f}%" if old else 'n/a'
+
+    print(f"base: {base_path} ({base.get('revision') or 'unknown revision'})")
+    print(f"new:  {new_path} ({new.get('revision') or 'unknown revision'})\n")
+    print(f"{'case':<12}{'ops/s':>26}{'p50 ms':>26}{'p99 ms':>26}{'peak RSS MB':>26}")
+    base_rows = {row['case']: row for row in base['results']}
+    for row in new['results']:
+        old = base_rows.get(row['case'])
+        if old is None:
+            continue
+        cells = [
+            f"{format_mb(old[key])} -> {format_mb(row[key])} {change(old[key], row[key])}".rstrip()
+            for key in ('throughput', 'p50_ms', 'p99_ms', 'peak_rss_mb')
+        ]
+        print(f"{row['case']:<12}" + ''.join(f"{cell:>26}" for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default=corpus.CORPUS_DIR, help='corpus directory (built if missing)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of every operation (default: 3)')
+    parser.add_argument('--workers', type=int, default=0, help='process pool size for summaries and PDFs (default: inline)')
+    parser.add_argument('--warm', action='store_true', help='keep the page, content and result caches enabled')
+    parser.add_argument('--only', nargs='+', choices=CASES, metavar='CASE', help=f'cases to run (default: all of {", ".join(CASES)})')
+    parser.add_argument('--output', help='save the results as JSON for --compare')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='compare two saved runs and exit')
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.dir, args.repeat, args.workers, args.warm)))
+        return
+
+    corpus.build(args.dir)
+    results = []
+    for case in args.only or CASES:
+        print(f"Running {case}...", file=sys.stderr)
+        results.append(run_isolated(case, args))
+    print_table(results)
+
+    if args.output:
+        run = {
+            'revision': git_revision(),
+            'created_at': time.time(),
+            'python': platform.python_version(),
+            'settings': {'repeat': args.repeat, 'workers': args.workers, 'warm': args.warm},
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+        print(f"\nSaved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark API cold start: import time and latency of the first requests.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--history ENTRIES]
+
+Each run starts a fresh interpreter, imports api.py and sends the first
+requests of a new worker through the test client. ``--history`` seeds a
+legacy research_history.json of that many entries, to show that boot time
+does not depend on the size of the history.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the fresh interpreter; prints one JSON line of timings in ms
+PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+import api
+timings = {'import api': (time.perf_counter() - started) * 1000}
+
+from fastapi.testclient import TestClient
+client = TestClient(api.app)
+requests = [
+    ('GET /api/health', lambda: client.get('/api/health')),
+    ('GET /api/history', lambda: client.get('/api/history', params={'limit': 10})),
+    ('POST /api/summarize', lambda: client.post('/api/summarize', json={'text': sys.argv[1]})),
+]
+for label, send in requests:
+    started = time.perf_counter()
+    response = send()
+    response.raise_for_status()
+    timings[label] = (time.perf_counter() - started) * 1000
+print(json.dumps(timings))
+"""
+
+SAMPLE_TEXT = ' '.join(
+    f"Sentence {i} explains how research agents fetch, extract and summarize sources." for i in range(40)
+)
+
+
+def write_history(path, entries):
+    now = time.time()
+    history = [
+        {
+            'id': i + 1,
+            'topic': f"topic {i % 50}",
+            'timestamp': now - i,
+            'results': [{'topic': f"topic {i % 50}", 'source': 'Example', 'summary': SAMPLE_TEXT, 'timestamp': now - i}],
+        }
+        for i in range(entries)
+    ]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f)
+
+
+def probe(workdir):
+    env = dict(
+        os.environ,
+        PYTHONPATH=ROOT,
+        HISTORY_DB_PATH=os.path.join(workdir, 'history.sqlite3'),
+        HISTORY_LEGACY_JSON=os.path.join(workdir, 'research_history.json'),
+        PAGE_CACHE_PATH=os.path.join(workdir, 'page_cache.sqlite3'),
+        CONTENT_CACHE_DISK_PATH=os.path.join(workdir, 'content_cache.sqlite3'),
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, SAMPLE_TEXT], cwd=workdir, env=env,
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to start (default: 5)')
+    parser.add_argument('--history', type=int, default=1000, help='legacy history entries to seed (default: 1000)')
+    args = parser.parse_args()
+
+    samples = {}
+    for _ in range(args.runs):
+        # A new directory per run, so every run is a first boot
+        with tempfile.TemporaryDirectory() as workdir:
+            write_history(os.path.join(workdir, 'research_history.json'), args.history)
+            for label, ms in probe(workdir).items():
+                samples.setdefault(label, []).append(ms)
+
+    print(f"{args.runs} cold starts, {args.history} legacy history entries\n")
+    print(f"{'step':<22}{'median ms':>12}{'max ms':>10}")
+    for label, values in samples.items():
+        print(f"{label:<22}{statistics.median(values):>12.1f}{max(values):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Check the Redis backends (history, page cache, content tier, job store).
+
+Usage:
+    python benchmarks/check_redis.py                  # in-process fakeredis
+    python benchmarks/check_redis.py --url redis://localhost:6379/0
+
+Without --url the checks run against fakeredis (pip install "fakeredis[lua]"),
+so no server is needed. With --url they run against a real Redis-compatible
+server, under a throwaway key prefix that is deleted afterwards.
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils import redis_store
+from utils.research_jobs import ResearchJobManager
+
+FAKE_URL = 'fakeredis://'
+
+
+def random_text(size):
+    return ''.join(random.choice(string.ascii_letters + ' ') for _ in range(size))
+
+
+def check_history(url, prefix):
+    with tempfile.TemporaryDirectory() as workdir:
+        legacy_json = os.path.join(workdir, 'research_history.json')
+        with open(legacy_json, 'w', encoding='utf-8') as f:
+            json.dump([
+                {'id': 3, 'topic': 'Élan vital', 'timestamp': 100.0, 'results': []},
+                {'id': 7, 'topic': 'python', 'timestamp': 200.0, 'results': [{'summary': 'x'}]},
+            ], f)
+        # Several workers opening the store at once import the file exactly once
+        stores = []
+        threads = [
+            threading.Thread(target=lambda: stores.append(redis_store.RedisHistoryStore(url, prefix, legacy_json)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    store = stores[0]
+    assert [entry['id'] for entry in store.query()] == [3, 7], "legacy ids are kept"
+    entry = store.append('python', 300.0, [{'summary': 'y'}], prompt='tell me')
+    assert entry['id'] == 8, "new ids continue after the legacy ones"
+    assert store.get(8)['prompt'] == 'tell me'
+    assert [e['id'] for e in store.query(since=150, until=300)] == [7, 8]
+    assert [e['id'] for e in store.query(topic='python', include_results=False)] == [7, 8]
+    assert [t['topic'] for t in store.topics(prefix='él')] == ['Élan vital']
+    assert {t['topic']: t['count'] for t in store.topics()} == {'Élan vital': 1, 'python': 2}
+    return "history: legacy import, ids, time/topic queries, topic prefixes"
+
+
+def check_page_cache(url, prefix):
+    cache = redis_store.RedisPageCache(url, max_bytes=10 ** 8, prefix=prefix)
+
+    def writer():
+        for _ in range(100):
+            cache.put('http://example.com/a', random_text(random.randint(100, 5000)))
+
+    threads = [threading.Thread(target=writer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    client = cache.client
+    tracked = int(client.get(f"{cache.prefix}:bytes"))
+    actual = int(client.hget(cache._key('http://example.com/a'), 'size'))
+    assert tracked == actual, f"size counter {tracked} != stored size {actual}"
+
+    small = redis_store.RedisPageCache(url, max_bytes=20000, prefix=f"{prefix}:small")
+    for i in range(50):
+        small.put(f"http://example.com/{i}", random_text(2000))
+    stats = small.stats()
+    assert 0 < stats['size_bytes'] <= small.max_bytes and stats['evictions'] > 0, stats
+    assert small.get('http://example.com/49') is not None and small.get('http://example.com/0') is None
+    return "page cache: concurrent size accounting, LRU eviction under the cap"
+
+
+def check_content_tier(url, prefix):
+    tier = redis_store.RedisContentTier(url, max_bytes=20000, prefix=prefix)
+    for i in range(50):
+        tier.put(f"key-{i}", random_text(2000))
+        tier.put(f"key-{i}", 'ignored: values are content-addressed')
+    assert tier.get('key-49') is not None and tier.get('key-0') is None
+    assert int(tier.client.get(f"{tier.prefix}:bytes")) <= tier.max_bytes
+    return "content tier: put-once values, LRU eviction under the cap"
+
+
+def check_jobs(url, prefix):
+    class InlineExecutor:
+        def submit(self, fn, *args):
+            fn(*args)
+
+    def runner(topic, depth, prompt=None, on_result=None):
+        on_result(0, 1, {'summary': 'done'})
+        return {'research_id': 1, 'results': [{'summary': 'done'}], 'result_count': 1}
+
+    store = redis_store.RedisJobStore(url, retention=60, prefix=prefix)
+    job = ResearchJobManager(InlineExecutor(), runner, store).submit('topic', 1)
+    # A second manager (another worker) sees the same job
+    other = ResearchJobManager(InlineExecutor(), runner, redis_store.RedisJobStore(url, retention=60, prefix=prefix))
+    assert other.get(job.id)['status'] == 'completed'
+    events, done = other.events_since(job.id, 0)
+    assert done and [event['event'] for event in events] == ['status', 'result', 'done']
+    return "job store: state and events visible from another manager"
+
+
+def cleanup(client, prefix):
+    for key in client.scan_iter(match=f"{prefix}:*"):
+        client.delete(key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Redis URL to check against (default: in-process fakeredis)')
+    args = parser.parse_args()
+
+    url = args.url
+    if url is None:
+        try:
+            import fakeredis
+        except ImportError:
+            sys.exit('fakeredis is not installed: pip install "fakeredis[lua]", or pass --url')
+        url = FAKE_URL
+        redis_store._clients[url] = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+
+    prefix = f"check-{uuid.uuid4().hex[:8]}"
+    checks = (check_history, check_page_cache, check_content_tier, check_jobs)
+    failures = 0
+    started = time.perf_counter()
+    try:
+        for check in checks:
+            try:
+                print(f"ok    {check(url, prefix)}")
+            except Exception as e:
+                failures += 1
+                print(f"FAIL  {check.__name__}: {type(e).__name__}: {e}")
+    finally:
+        cleanup(redis_store.get_redis(url), prefix)
+
+    print(f"\n{len(checks) - failures}/{len(checks)} checks passed in {time.perf_counter() - started:.1f}s")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Offline benchmark corpus: HTML pages and PDFs served by a local HTTP server.
+
+Usage:
+    python benchmarks/corpus.py build [--dir DIR]
+    python benchmarks/corpus.py record URL [URL ...] [--dir DIR]
+
+``build`` writes deterministic synthetic HTML pages and text PDFs of 1-1000
+pages. ``record`` saves real pages once so later runs need no network; any
+``*.html`` file dropped into ``DIR/html`` is part of the corpus as well.
+"""
+import argparse
+import contextlib
+import functools
+import http.server
+import os
+import random
+import re
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_extraction import WORDS, synthetic_page
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+# Synthetic pages to generate, and the page counts of the generated PDFs
+HTML_PAGES = 8
+PDF_PAGES = (1, 10, 100, 1000)
+
+# Topic under which the corpus pages are listed in the benchmark catalog
+TOPIC = 'benchmark corpus'
+
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_pdf(path, page_count, lines_per_page=40, seed=0):
+    """Write a text-only PDF with ``page_count`` pages of random sentences."""
+    rng = random.Random(seed)
+    objects = {
+        1: b'<< /Type /Catalog /Pages 2 0 R >>',
+        3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    }
+    kids = []
+    for page in range(page_count):
+        lines = [
+            ' '.join(rng.choices(WORDS, k=rng.randint(6, 12))).capitalize() + '.'
+            for _ in range(lines_per_page)
+        ]
+        stream = 'BT /F1 10 Tf 14 TL 50 780 Td ' + ' '.join(f'({_pdf_escape(line)}) Tj T*' for line in lines) + ' ET'
+        stream = stream.encode('latin-1')
+        page_id, content_id = 4 + 2 * page, 5 + 2 * page
+        kids.append(page_id)
+        objects[page_id] = (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id
+        )
+        objects[content_id] = b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream)
+    objects[2] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % kid for kid in kids), page_count
+    )
+
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4\n')
+        offsets = []
+        for number in range(1, len(objects) + 1):
+            offsets.append(f.tell())
+            f.write(b'%d 0 obj\n%s\nendobj\n' % (number, objects[number]))
+        xref = f.tell()
+        f.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b'%010d 00000 n \n' % offset)
+        f.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+
+
+def build(directory=CORPUS_DIR, html_pages=HTML_PAGES, pdf_pages=PDF_PAGES):
+    """Generate the synthetic part of the corpus; existing files are kept."""
+    os.makedirs(os.path.join(directory, 'html'), exist_ok=True)
+    os.makedirs(os.path.join(directory, 'pdf'), exist_ok=True)
+
+    for seed in range(html_pages):
+        path = os.path.join(directory, 'html', f'synthetic-{seed:02d}.html')
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(synthetic_page(sections=15 * (1 + seed % 4), seed=seed))
+
+    for pages in pdf_pages:
+        path = os.path.join(directory, 'pdf', f'pages-{pages:04d}.pdf')
+        if not os.path.exists(path):
+            write_pdf(path, pages, seed=pages)
+
+
+def record(urls, directory=CORPUS_DIR):
+    """Save live pages into the corpus so later benchmark runs stay offline."""
+    import requests
+
+    os.makedirs(os.path.join(directory, 'html'), exist_ok=True)
+    for url in urls:
+        response = requests.get(url, timeout=30, headers={'User-Agent': 'Mozilla/5.0 (research-agent benchmark)'})
+        response.raise_for_status()
+        slug = re.sub(r'[^a-zA-Z0-9]+', '-', url.split('://', 1)[-1]).strip('-')[:80]
+        path = os.path.join(directory, 'html', f'recorded-{slug}.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        print(f"Recorded {url} -> {path}")
+
+
+def html_files(directory=CORPUS_DIR):
+    folder = os.path.join(directory, 'html')
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.endswith('.html'))
+
+
+def pdf_files(directory=CORPUS_DIR):
+    folder = os.path.join(directory, 'pdf')
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.endswith('.pdf'))
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like real sites
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve(directory=CORPUS_DIR):
+    """Serve ``directory`` on a free localhost port and yield its base URL."""
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=('build', 'record'))
+    parser.add_argument('urls', nargs='*', help='pages to record')
+    parser.add_argument('--dir', default=CORPUS_DIR, help=f'corpus directory (default: {CORPUS_DIR})')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build(args.dir)
+        print(f"Corpus ready in {args.dir}: {len(html_files(args.dir))} HTML pages, {len(pdf_files(args.dir))} PDFs")
+    else:
+        if not args.urls:
+            parser.error('record needs at least one URL')
+        record(args.urls, args.dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,98 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Only the project's own .env is read, and python-dotenv is imported only
+# when that file exists (instead of searching the directory tree on import)
+DOTENV_PATH = os.getenv('DOTENV_PATH', os.path.join(BASE_DIR, '.env'))
+if os.path.isfile(DOTENV_PATH):
+    from dotenv import load_dotenv
+    load_dotenv(DOTENV_PATH)
 
 class Config:
     SERPAPI_KEY = os.getenv('SERPAPI_KEY')
-    OPENAI_KEY = os.getenv('OPENAI_KEY')
\ No newline at end of file
+    OPENAI_KEY = os.getenv('OPENAI_KEY')
+
+    # Maximum number of sources fetched at the same time across all research calls
+    MAX_CONCURRENT_FETCHES = int(os.getenv('MAX_CONCURRENT_FETCHES', '8'))
+
+    # Minimum delay between two requests to the same host (seconds)
+    HOST_MIN_INTERVAL = float(os.getenv('HOST_MIN_INTERVAL', '2.0'))
+    # Upper bound on any Retry-After back-off we agree to honor (seconds)
+    HOST_MAX_RETRY_AFTER = float(os.getenv('HOST_MAX_RETRY_AFTER', '60'))
+
+    # HTTP session used by the web scraper
+    SCRAPER_TIMEOUT = float(os.getenv('SCRAPER_TIMEOUT', '10'))
+    SCRAPER_POOL_CONNECTIONS = int(os.getenv('SCRAPER_POOL_CONNECTIONS', '32'))  # hosts kept in the pool
+    SCRAPER_POOL_MAXSIZE = int(os.getenv('SCRAPER_POOL_MAXSIZE', '8'))  # keep-alive connections per host
+    # Downloads are streamed and cut off after this many (decompressed) bytes
+    SCRAPER_MAX_BYTES = int(os.getenv('SCRAPER_MAX_BYTES', str(5 * 1024 * 1024)))
+    # Responses with any other Content-Type are rejected before the body is read
+    SCRAPER_CONTENT_TYPES = tuple(
+        t.strip().lower() for t in os.getenv('SCRAPER_CONTENT_TYPES', 'text/html,application/xhtml+xml').split(',') if t.strip()
+    )
+
+    # On-disk cache of fetched pages
+    PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    PAGE_CACHE_PATH = os.getenv('PAGE_CACHE_PATH', os.path.join(BASE_DIR, 'page_cache.sqlite3'))
+    PAGE_CACHE_TTL = float(os.getenv('PAGE_CACHE_TTL', '3600'))
+    PAGE_CACHE_MAX_BYTES = int(os.getenv('PAGE_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+
+    # Content-addressed cache of extracted text and summaries
+    CONTENT_CACHE_MAX_BYTES = int(os.getenv('CONTENT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    CONTENT_CACHE_POLICY = os.getenv('CONTENT_CACHE_POLICY', 'lru')  # 'lru' or 'fifo'
+    # SQLite tier shared by the workers of one machine (with CACHE_BACKEND=sqlite); empty disables it
+    CONTENT_CACHE_DISK_PATH = os.getenv('CONTENT_CACHE_DISK_PATH', os.path.join(BASE_DIR, 'content_cache.sqlite3'))
+    # Size cap of the shared tier (the SQLite file, or the redis backend)
+    CONTENT_CACHE_DISK_MAX_BYTES = int(os.getenv('CONTENT_CACHE_DISK_MAX_BYTES', str(512 * 1024 * 1024)))
+
+    # Research history database (the old JSON file is imported on first start).
+    # Defaults live next to the code so every worker opens the same files,
+    # whatever directory it was started from
+    HISTORY_DB_PATH = os.getenv('HISTORY_DB_PATH', os.path.join(BASE_DIR, 'research_history.sqlite3'))
+    HISTORY_LEGACY_JSON = os.getenv('HISTORY_LEGACY_JSON', os.path.join(BASE_DIR, 'research_history.json'))
+
+    # Shared state for several workers/replicas: 'sqlite' keeps the history and
+    # caches in local SQLite files (safe across the workers of one machine),
+    # 'redis' keeps them on a Redis-compatible server shared by every node
+    HISTORY_BACKEND = os.getenv('HISTORY_BACKEND', 'sqlite')
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'sqlite')
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    REDIS_PREFIX = os.getenv('REDIS_PREFIX', 'research-agent')  # namespace for every key
+
+    # API worker pools: threads for blocking I/O, processes for CPU-heavy parsing
+    IO_WORKERS = int(os.getenv('IO_WORKERS', '16'))
+    IO_QUEUE_LIMIT = int(os.getenv('IO_QUEUE_LIMIT', '64'))
+    CPU_WORKERS = int(os.getenv('CPU_WORKERS', str(os.cpu_count() or 2)))
+    CPU_QUEUE_LIMIT = int(os.getenv('CPU_QUEUE_LIMIT', '32'))
+
+    # Largest number of topics accepted by one batch research call
+    RESEARCH_BATCH_MAX_TOPICS = int(os.getenv('RESEARCH_BATCH_MAX_TOPICS', '100'))
+
+    # Seconds a finished background research job stays available for polling
+    RESEARCH_JOB_RETENTION = float(os.getenv('RESEARCH_JOB_RETENTION', '3600'))
+
+    # Pages handed to one PDF extraction worker at a time
+    PDF_CHUNK_PAGES = int(os.getenv('PDF_CHUNK_PAGES', '25'))
+
+    # Summarizer: long text is split into windows of this many characters
+    SUMMARY_WINDOW_CHARS = int(os.getenv('SUMMARY_WINDOW_CHARS', '20000'))
+    # Sentences with fewer words are treated as navigation chrome
+    SUMMARY_MIN_WORDS = int(os.getenv('SUMMARY_MIN_WORDS', '6'))
+
+    # Bulk summarization: texts per worker task and tasks in flight per request
+    SUMMARY_BATCH_SIZE = int(os.getenv('SUMMARY_BATCH_SIZE', '256'))
+    SUMMARY_BATCH_INFLIGHT = int(os.getenv('SUMMARY_BATCH_INFLIGHT', '4'))
+    # Seconds a later chunk waits for a free worker before its texts are reported as failed
+    SUMMARY_BATCH_MAX_WAIT = float(os.getenv('SUMMARY_BATCH_MAX_WAIT', '30'))
+
+    # HTML extraction engine: 'auto', 'selectolax', 'lxml', 'bs4' or 'legacy' (whole page)
+    HTML_EXTRACTOR = os.getenv('HTML_EXTRACTOR', 'auto')
+
+    # Identical concurrent research calls share one computation; results are
+    # reused for this many seconds afterwards (0 only coalesces in-flight calls)
+    RESEARCH_RESULT_TTL = float(os.getenv('RESEARCH_RESULT_TTL', '60'))
+
+    # Curated topic -> sources catalog, reloaded when the file changes
+    TOPIC_CATALOG_PATH = os.getenv('TOPIC_CATALOG_PATH', os.path.join(BASE_DIR, 'data', 'topic_sources.json'))
+    TOPIC_CATALOG_RELOAD_INTERVAL = float(os.getenv('TOPIC_CATALOG_RELOAD_INTERVAL', '5'))
@@ -1,27 +1,82 @@
-from utils.web_scrapper import WebScraper  # Assuming the class is named WebScraper with one 'p'
-from utils.ai_processor import AIProcessor
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from config import Config
+from utils.lazy import Lazy
+from utils.metrics import span
+from utils.single_flight import SingleFlight
+import contextvars
 import time
 
 class ResearchAgent:
-    def __init__(self):
+    def __init__(self, max_concurrent_fetches=None, summary_pool=None):
+        # Components are created on first use, so constructing the agent does not
+        # import the HTTP stack or numpy/scipy, nor open the page cache
+        self.summary_pool = summary_pool
+        self._scraper = Lazy(self._create_scraper)
+        self._processor = Lazy(self._create_processor)
+        
+        # Shared pool that bounds how many sources are fetched at once,
+        # across every research call made through this agent
+        self.max_concurrent_fetches = max_concurrent_fetches or Config.MAX_CONCURRENT_FETCHES
+        self.fetch_pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_fetches,
+            thread_name_prefix="source-fetch"
+        )
+        
+        # Coalesces identical concurrent research calls and briefly caches their results
+        self.flight = SingleFlight(ttl=Config.RESEARCH_RESULT_TTL)
+    
+    @staticmethod
+    def _create_scraper():
         from utils.web_scrapper import WebScraper
+        return WebScraper()
+    
+    def _create_processor(self):
         from utils.ai_processor import AIProcessor
-        
-        # Initialize components
-        self.scraper = WebScraper()
-        self.processor = AIProcessor()
+        return AIProcessor(pool=self.summary_pool)
+    
+    @property
+    def scraper(self):
+        return self._scraper.instance()
     
-    def research(self, topic, depth=2):
+    @property
+    def processor(self):
+        return self._processor.instance()
+    
+    def close(self):
+        """Stop the fetch pool and release the scraper's connections and cache."""
+        self.fetch_pool.shutdown(wait=False, cancel_futures=True)
+        if self._scraper.created:
+            self.scraper.close()
+    
+    def research(self, topic, depth=2, on_result=None):
         """
         Perform research on the specified topic.
         
         Args:
             topic: The research topic (string)
             depth: Number of sources to analyze (default: 2)
+            on_result: Optional callback ``on_result(index, total, result)`` invoked
+                as soon as each source has been analyzed, in completion order
             
         Returns:
             List of research results, each containing topic, source, summary, and timestamp
         """
+        # Identical requests (same normalized topic and depth) share one computation
+        key = (' '.join((topic or '').lower().split()), depth)
+        results, shared = self.flight.do(key, lambda: self._research(topic, depth, on_result))
+        
+        results = [dict(item) for item in results]
+        if shared:
+            print(f"Reusing research results for '{topic}'")
+            for index, item in enumerate(results):
+                if topic and topic != "string":
+                    item['topic'] = topic
+                # Followers did not see the sources complete, so replay them
+                if on_result:
+                    on_result(index, len(results), item)
+        return results
+    
+    def _research(self, topic, depth, on_result=None):
         print(f"Researching user query: '{topic}'")
         
         # Validate input
@@ -30,7 +85,8 @@ class ResearchAgent:
             topic = "general information"
         
         # Search for relevant information sources
-        search_results = self.scraper.search_web(topic)
+        with span('search'):
+            search_results = self.scraper.search_web(topic)
         
         # Limit the number of results based on depth
         search_results = search_results[:depth] if search_results else []
@@ -38,45 +94,160 @@ class ResearchAgent:
         # If no results were found, provide a fallback
         if not search_results:
             print(f"No results found for topic: {topic}")
-            return [{
-                'topic': topic,
-                'source': 'No sources found',
-                'summary': f"Unable to find relevant information for '{topic}'. Please try a different search term or check your internet connection.",
-                'timestamp': time.time()
-            }]
+            fallback = self._no_sources_result(topic)
+            if on_result:
+                on_result(0, 1, fallback)
+            return [fallback]
         
-        results = []
-        for i, result in enumerate(search_results):
-            source_url = result['link']
-            print(f"Analyzing source {i+1}/{len(search_results)}: {source_url}")
-            
-            # Get the page content
-            html_content = self.scraper.get_page(source_url)
+        # Fetch and analyze all sources in parallel, reporting each one as it
+        # finishes while keeping the returned list in the original order.
+        # Each source runs in a copy of this context so its spans reach the caller's trace
+        total = len(search_results)
+        futures = {
+            self.fetch_pool.submit(contextvars.copy_context().run, self._analyze_source, topic, result, i, total): i
+            for i, result in enumerate(search_results)
+        }
+        results = [None] * total
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            if on_result:
+                on_result(index, total, results[index])
+        
+        print(f"Research complete. Found {len(results)} results for '{topic}'")
+        return results
+
+    def _analyze_source(self, topic, result, index, total):
+        """
+        Fetch, extract and summarize a single search result.
+        
+        Any failure is confined to this source and reported as a placeholder
+        result, so one bad source never affects the others.
+        """
+        print(f"Analyzing source {index+1}/{total}: {result['link']}")
+        return self._source_result(topic, result, self._summarize_url(result['link']))
+    
+    def _summarize_url(self, url):
+        """
+        Fetch, extract and summarize one URL.
+        
+        Returns:
+            dict with ``summary`` and ``truncated``, or None if the page could
+            not be retrieved
+        """
+        try:
+            # Get the page content (capped in size, non-HTML is rejected)
+            page = self.scraper.fetch_page(url)
             
-            if html_content:
+            if page and page['body']:
                 # Extract main content
-                main_content = self.scraper.extract_main_content(html_content)
+                main_content = self.scraper.extract_main_content(page['body'])
                 
                 # Generate summary
                 summary = self.processor.summarize(main_content)
                 
-                # Add to results
-                results.append({
-                    'topic': topic,  # Use the actual user-provided topic
-                    'source': result['title'] if 'title' in result else source_url,
-                    'summary': summary,
-                    'timestamp': time.time()
-                })
-            else:
-                # Add a placeholder for failed sources
-                results.append({
-                    'topic': topic,
-                    'source': result['title'] if 'title' in result else source_url,
-                    'summary': f"Unable to retrieve content from this source. The website may be unavailable or may have blocked the request.",
-                    'timestamp': time.time()
-                })
+                return {'summary': summary, 'truncated': page['truncated']}
+        except Exception as e:
+            print(f"Error analyzing source {url}: {str(e)}")
+        return None
+    
+    @staticmethod
+    def _source_result(topic, result, analysis):
+        """Build the result for one source of a topic from its URL's analysis."""
+        source_name = result['title'] if 'title' in result else result['link']
+        if analysis is None:
+            # Add a placeholder for failed sources
+            return {
+                'topic': topic,
+                'source': source_name,
+                'summary': f"Unable to retrieve content from this source. The website may be unavailable or may have blocked the request.",
+                'timestamp': time.time()
+            }
+        return {
+            'topic': topic,  # Use the actual user-provided topic
+            'source': source_name,
+            'summary': analysis['summary'],
+            'timestamp': time.time(),
+            'truncated': analysis['truncated']
+        }
+    
+    @staticmethod
+    def _no_sources_result(topic):
+        return {
+            'topic': topic,
+            'source': 'No sources found',
+            'summary': f"Unable to find relevant information for '{topic}'. Please try a different search term or check your internet connection.",
+            'timestamp': time.time()
+        }
+    
+    def research_batch(self, topics, depth=2, on_topic=None):
+        """
+        Research many topics at once, fetching every distinct source URL only once.
+        
+        All topics are searched first; the union of their source URLs is then
+        fetched and summarized through the shared fetch pool, and each summary
+        is fanned back out to every topic that listed the URL.
+        
+        Args:
+            topics: List of research topics
+            depth: Number of sources to analyze per topic
+            on_topic: Optional callback ``on_topic(index, topic, results)`` invoked
+                as soon as all sources of a topic are done, in completion order
+            
+        Returns:
+            List with the results of each topic, in input order
+        """
+        plans = []
+        for topic in topics:
+            if not topic or topic == "string":
+                topic = "general information"
+            with span('search'):
+                search_results = self.scraper.search_web(topic)
+            plans.append((topic, (search_results or [])[:depth]))
+        
+        # Plan the union of source URLs and remember which topic slots use each
+        users = {}  # link -> [(topic index, source index)]
+        for topic_index, (_, sources) in enumerate(plans):
+            for source_index, source in enumerate(sources):
+                users.setdefault(source['link'], []).append((topic_index, source_index))
+        total_sources = sum(len(sources) for _, sources in plans)
+        print(f"Batch research: {len(plans)} topics, {total_sources} sources, {len(users)} unique URLs")
+        
+        results = [[None] * len(sources) for _, sources in plans]
+        remaining = [len(sources) for _, sources in plans]
+        
+        def finish(topic_index):
+            if on_topic:
+                on_topic(topic_index, plans[topic_index][0], results[topic_index])
+        
+        for topic_index, (topic, sources) in enumerate(plans):
+            if not sources:
+                print(f"No results found for topic: {topic}")
+                results[topic_index] = [self._no_sources_result(topic)]
+                finish(topic_index)
+        
+        # Keep at most one pool's worth of batch URLs queued, so single research
+        # calls arriving meanwhile are not stuck behind the whole batch
+        links = iter(users)
+        in_flight = {}
+        while True:
+            for link in links:
+                future = self.fetch_pool.submit(contextvars.copy_context().run, self._summarize_url, link)
+                in_flight[future] = link
+                if len(in_flight) >= self.max_concurrent_fetches:
+                    break
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                analysis = future.result()
+                for topic_index, source_index in users[in_flight.pop(future)]:
+                    topic, sources = plans[topic_index]
+                    results[topic_index][source_index] = self._source_result(topic, sources[source_index], analysis)
+                    remaining[topic_index] -= 1
+                    if remaining[topic_index] == 0:
+                        finish(topic_index)
         
-        print(f"Research complete. Found {len(results)} results for '{topic}'")
         return results
 
 if __name__ == "__main__":
@@ -1,14 +1,348 @@
+import re
+from collections import Counter, deque
+from itertools import islice
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from config import Config
+from utils.content_cache import ContentCache, get_content_cache
+from utils.executor import ExecutorSaturated
+from utils.metrics import span
+
+# Sentence ends at ., ! or ? followed by whitespace, or at a line break
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\s*\n+\s*')
+WORD = re.compile(r"[a-z0-9][a-z0-9'-]*")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just me more most my myself no
+nor not now of off on once only or other our ours ourselves out over own same she should so some such than
+that the their theirs them themselves then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours yourself yourselves
+""".split())
+
+
+def iter_sentences(text, start=0, end=None):
+    """
+    Lazily yield ``(position, sentence)`` pairs from ``text[start:end]``.
+
+    Sentences are produced one at a time, so only the current sentence is
+    ever materialized.
+    """
+    end = len(text) if end is None else end
+    position = start
+    for match in SENTENCE_BOUNDARY.finditer(text, start, end):
+        sentence = text[position:match.start()].strip()
+        if sentence:
+            yield position, sentence
+        position = match.end()
+    sentence = text[position:end].strip()
+    if sentence:
+        yield position, sentence
+
+
+def fits_in_sentences(text, max_sentences):
+    """True if ``text`` has at most ``max_sentences`` sentences (counts lazily)."""
+    return sum(1 for _ in islice(iter_sentences(text), max_sentences + 1)) <= max_sentences
+
+
+def iter_windows(text, window_chars):
+    """
+    Yield ``(start, end)`` offsets splitting ``text`` into windows of at most
+    ``window_chars`` characters, cut at a sentence or line break when possible.
+    """
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + window_chars, length)
+        if end < length:
+            cut = max(text.rfind('\n', start, end), text.rfind('. ', start, end))
+            if cut > start:
+                end = cut + 1
+        yield start, end
+        start = end
+
+
+def content_words(sentence):
+    """Lowercased words of a sentence without stopwords."""
+    return [word for word in WORD.findall(sentence.lower()) if word not in STOPWORDS]
+
+
+def candidate_sentences(text, offset, min_words):
+    """
+    Yield ``(position, sentence, words)`` for every sentence worth ranking.
+
+    Navigation chrome (menus, sidebars) comes out as very short "sentences"
+    and is skipped.
+    """
+    for position, sentence in iter_sentences(text):
+        words = content_words(sentence)
+        if len(sentence.split()) < min_words or not words:
+            continue
+        yield offset + position, sentence, words
+
+
+def term_matrix(token_lists):
+    """
+    Build a sparse sentence x term count matrix.
+
+    Returns:
+        (matrix, terms) where ``terms[j]`` is the word of column ``j``
+    """
+    vocabulary = {}
+    indices = []
+    indptr = [0]
+    data = []
+    for words in token_lists:
+        for word, count in Counter(words).items():
+            indices.append(vocabulary.setdefault(word, len(vocabulary)))
+            data.append(count)
+        indptr.append(len(indices))
+
+    matrix = csr_matrix(
+        (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(token_lists), len(vocabulary))
+    )
+    return matrix, list(vocabulary)
+
+
+def tfidf_scores(token_lists, doc_ids):
+    """
+    Score sentences of one or more documents in a single vectorized pass.
+
+    Every sentence becomes an L2-normalized TF-IDF vector, with IDF computed
+    over the sentences of its own document. Its score is the cosine similarity
+    to the document centroid (the TF-IDF weighted term totals), so sentences
+    that cover the document's dominant vocabulary rank highest.
+
+    Args:
+        token_lists: Content words of each sentence
+        doc_ids: Document index of each sentence (numpy int array)
+
+    Returns:
+        numpy array with one score per sentence
+    """
+    matrix, terms = term_matrix(token_lists)
+    if matrix.nnz == 0:
+        return np.zeros(len(token_lists))
+
+    coo = matrix.tocoo()
+    rows, cols, counts = coo.row, coo.col, coo.data
+    vocab_size = len(terms)
+
+    # Per-(document, term) keys give document frequency and total term counts
+    entry_docs = doc_ids[rows]
+    keys = entry_docs * vocab_size + cols
+    unique_keys, inverse, doc_freq = np.unique(keys, return_inverse=True, return_counts=True)
+    term_totals = np.bincount(inverse, weights=counts)
+
+    sentences_per_doc = np.bincount(doc_ids).astype(np.float64)
+    key_docs = unique_keys // vocab_size
+    idf = np.log((1.0 + sentences_per_doc[key_docs]) / (1.0 + doc_freq)) + 1.0
+
+    # Normalized sentence vectors
+    weights = counts * idf[inverse]
+    row_norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=len(token_lists)))
+    weights /= row_norms[rows]
+
+    # Normalized document centroids
+    centroid = term_totals * idf
+    centroid_norms = np.sqrt(np.bincount(key_docs, weights=centroid ** 2, minlength=len(sentences_per_doc)))
+    centroid /= centroid_norms[key_docs]
+
+    return np.bincount(rows, weights=weights * centroid[inverse], minlength=len(token_lists))
+
+
+def top_sentences(scores, doc_ids, positions, k):
+    """
+    Return the indices of each document's ``k`` best sentences.
+
+    Ties are broken by position, and the result is ordered by document and then
+    by position in the document.
+    """
+    order = np.lexsort((positions, -scores, doc_ids))
+    sorted_docs = doc_ids[order]
+    rank = np.arange(len(order)) - np.searchsorted(sorted_docs, sorted_docs, side='left')
+    chosen = order[rank < k]
+    return chosen[np.lexsort((positions[chosen], doc_ids[chosen]))]
+
+
+def summarize_window(window, offset, top_k, min_words):
+    """
+    Map step: pick candidate sentences from one window of text.
+
+    Module-level so it can run in a process pool.
+
+    Returns:
+        (candidates, stats) where candidates is a list of
+        ``(position, sentence, words)`` for the window's ``top_k`` best
+        sentences and stats holds the window's ``term_counts`` and
+        ``doc_freq`` Counters and its ``sentences`` count
+    """
+    sentences = list(candidate_sentences(window, offset, min_words))
+    term_counts = Counter()
+    doc_freq = Counter()
+    for _, _, words in sentences:
+        term_counts.update(words)
+        doc_freq.update(set(words))
+    stats = {'term_counts': term_counts, 'doc_freq': doc_freq, 'sentences': len(sentences)}
+
+    if len(sentences) <= top_k:
+        return sentences, stats
+
+    doc_ids = np.zeros(len(sentences), dtype=np.int64)
+    scores = tfidf_scores([words for _, _, words in sentences], doc_ids)
+    positions = np.asarray([position for position, _, _ in sentences])
+    chosen = top_sentences(scores, doc_ids, positions, top_k)
+    return [sentences[i] for i in chosen], stats
+
+
+def rank_candidates(candidates, stats, k):
+    """
+    Reduce step: rank the windows' candidates against document-wide statistics.
+
+    Uses the same TF-IDF/centroid scoring as tfidf_scores, with document
+    frequencies and term totals merged from every window.
+    """
+    matrix, terms = term_matrix([words for _, _, words in candidates])
+    idf = np.log(
+        (1.0 + stats['sentences']) / (1.0 + np.asarray([stats['doc_freq'][term] for term in terms], dtype=np.float64))
+    ) + 1.0
+    centroid = np.asarray([stats['term_counts'][term] for term in terms], dtype=np.float64) * idf
+
+    weighted = csr_matrix(matrix.multiply(idf))
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    scores = (weighted @ centroid) / norms
+
+    doc_ids = np.zeros(len(candidates), dtype=np.int64)
+    positions = np.asarray([position for position, _, _ in candidates])
+    return [candidates[i] for i in top_sentences(scores, doc_ids, positions, k)]
+
+
 class AIProcessor:
-    def __init__(self):
-        # Simple implementation without external dependencies
-        pass
-        
-    def summarize(self, text):
+    def __init__(self, cache=None, pool=None, window_chars=None, min_words=None):
+        """
+        Extractive TF-IDF summarizer (runs locally, no external services).
+
+        Args:
+            cache: ContentCache for summaries (defaults to the shared cache)
+            pool: Optional BoundedExecutor used to summarize windows in parallel
+            window_chars: Size of the windows long text is split into
+            min_words: Sentences with fewer words are treated as page chrome
+        """
+        self.cache = cache if cache is not None else get_content_cache()
+        self.pool = pool
+        self.window_chars = window_chars or Config.SUMMARY_WINDOW_CHARS
+        self.min_words = min_words or Config.SUMMARY_MIN_WORDS
+
+    def summarize(self, text, max_sentences=3):
         if not text or len(text) < 10:
             return "No content available to summarize."
-            
-        # Simple summarization by taking the first few sentences
-        sentences = text.split('. ')
-        summary = '. '.join(sentences[:3]) + '.' if len(sentences) > 3 else text
-        
-        return summary
\ No newline at end of file
+
+        # Identical text is only ever summarized once
+        key = ContentCache.make_key('summary', text, max_sentences)
+        with span('summarize'):
+            return self.cache.get_or_compute(key, lambda: self._summarize(text, max_sentences))
+
+    def summarize_batch(self, texts, max_sentences=3):
+        """
+        Summarize many documents at once.
+
+        Documents that fit in a single window are tokenized together and ranked
+        with one vectorized tfidf_scores call; longer ones go through the
+        map-reduce path. Results match summarize() and are returned in order.
+        """
+        summaries = [None] * len(texts)
+        keys = [None] * len(texts)
+        sentences, doc_ids, pending = [], [], []
+
+        for i, text in enumerate(texts):
+            if not text or len(text) < 10:
+                summaries[i] = "No content available to summarize."
+                continue
+
+            keys[i] = ContentCache.make_key('summary', text, max_sentences)
+            cached = self.cache.get(keys[i])
+            if cached is not None:
+                summaries[i] = cached
+            elif len(text) > self.window_chars:
+                summaries[i] = self.summarize(text, max_sentences)
+            elif fits_in_sentences(text, max_sentences):
+                summaries[i] = text
+            else:
+                doc_sentences = list(candidate_sentences(text, 0, self.min_words))
+                if not doc_sentences:
+                    summaries[i] = self._leading_sentences(text, max_sentences)
+                    continue
+                sentences.extend(doc_sentences)
+                doc_ids.extend([len(pending)] * len(doc_sentences))
+                pending.append(i)
+
+        if pending:
+            doc_ids = np.asarray(doc_ids, dtype=np.int64)
+            scores = tfidf_scores([words for _, _, words in sentences], doc_ids)
+            positions = np.asarray([position for position, _, _ in sentences])
+            chosen = top_sentences(scores, doc_ids, positions, max_sentences)
+
+            selected = [[] for _ in pending]
+            for index in chosen:
+                selected[doc_ids[index]].append(sentences[index][1])
+            for doc, i in enumerate(pending):
+                summaries[i] = ' '.join(selected[doc])
+
+        for i, key in enumerate(keys):
+            if key is not None:
+                self.cache.put(key, summaries[i])
+        return summaries
+
+    def _map_windows(self, text, top_k):
+        """Run summarize_window over every window, in parallel when a pool is set."""
+        windows = iter_windows(text, self.window_chars)
+
+        if self.pool is None:
+            for start, end in windows:
+                yield summarize_window(text[start:end], start, top_k, self.min_words)
+            return
+
+        # Keep at most one window per worker in flight so memory stays bounded
+        pending = deque()
+        for start, end in windows:
+            try:
+                pending.append(self.pool.submit(summarize_window, text[start:end], start, top_k, self.min_words))
+            except ExecutorSaturated:
+                # Pool is busy - do this window here rather than fail the summary
+                yield summarize_window(text[start:end], start, top_k, self.min_words)
+            if len(pending) >= self.pool.max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    @staticmethod
+    def _leading_sentences(text, max_sentences):
+        return ' '.join(sentence for _, sentence in islice(iter_sentences(text), max_sentences))
+
+    def _summarize(self, text, max_sentences=3):
+        # Short text is returned unchanged, as before
+        if fits_in_sentences(text, max_sentences):
+            return text
+
+        # Map: best candidate sentences and term statistics per window
+        candidates = []
+        stats = {'term_counts': Counter(), 'doc_freq': Counter(), 'sentences': 0}
+        for window_candidates, window_stats in self._map_windows(text, max_sentences):
+            candidates.extend(window_candidates)
+            stats['term_counts'].update(window_stats['term_counts'])
+            stats['doc_freq'].update(window_stats['doc_freq'])
+            stats['sentences'] += window_stats['sentences']
+
+        if not candidates:
+            # Nothing but chrome - fall back to the leading sentences
+            return self._leading_sentences(text, max_sentences)
+
+        # Reduce: rank the candidates against document-wide statistics,
+        # keeping the selected sentences in document order
+        best = rank_candidates(candidates, stats, max_sentences)
+        return ' '.join(sentence for _, sentence, _ in best)
@@ -0,0 +1,198 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from config import Config
+
+
+class SQLiteContentTier:
+    """Shared tier of the ContentCache: compressed values in a SQLite file, LRU-trimmed to ``max_bytes``."""
+
+    name = 'sqlite'
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS content (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_content_accessed ON content (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM content WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE content SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def put(self, key, value):
+        data = zlib.compress(value.encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO content (key, value, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM content").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM content ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM content WHERE key = ?", (key,))
+            total -= size
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ContentCache:
+    """
+    Content-addressed memo cache for derived text (extracted content, summaries).
+
+    Keys are SHA-256 digests of the raw input (HTML, PDF bytes, text) plus a
+    namespace, so identical inputs are never parsed or summarized twice. Values
+    live in a bounded in-memory tier and, when ``shared`` is given, in a
+    compressed tier that survives restarts and is shared by every worker using
+    it (SQLiteContentTier for one machine, RedisContentTier across machines).
+    ``disk_path`` is a shorthand for a SQLite tier at that path.
+
+    ``policy`` selects how the memory tier evicts: ``"lru"`` drops the least
+    recently used entry, ``"fifo"`` drops the oldest inserted one.
+    """
+
+    POLICIES = ('lru', 'fifo')
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, policy='lru', disk_path=None, disk_max_bytes=512 * 1024 * 1024,
+                 shared=None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}', expected one of {self.POLICIES}")
+
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> value (str)
+        self._memory_bytes = 0
+        self._metrics = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'evictions': 0}
+
+        if shared is None and disk_path:
+            shared = SQLiteContentTier(disk_path, disk_max_bytes)
+        self._shared = shared
+
+    @staticmethod
+    def make_key(namespace, data, *params):
+        """Build a cache key from a namespace, the raw input and any parameters."""
+        if isinstance(data, str):
+            data = data.encode('utf-8', errors='surrogatepass')
+        digest = hashlib.sha256(data).hexdigest()
+        suffix = ':'.join(str(p) for p in params)
+        return f"{namespace}:{suffix}:{digest}" if suffix else f"{namespace}:{digest}"
+
+    def get(self, key):
+        """Return the cached value for ``key`` or None."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                if self.policy == 'lru':
+                    self._memory.move_to_end(key)
+                self._metrics['hits'] += 1
+                return value
+
+        # The shared tier does its own locking, so slow lookups never block memory hits
+        value = self._shared.get(key) if self._shared is not None else None
+        with self._lock:
+            if value is None:
+                self._metrics['misses'] += 1
+                return None
+            self._metrics['shared_hits'] += 1
+            self._store_memory(key, value)
+        return value
+
+    def put(self, key, value):
+        """Store ``value`` under ``key`` in every configured tier."""
+        with self._lock:
+            self._store_memory(key, value)
+        if self._shared is not None:
+            self._shared.put(key, value)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def _store_memory(self, key, value):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = value
+        self._memory_bytes += size
+
+        while self._memory_bytes > self.max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._metrics['evictions'] += 1
+
+    def stats(self):
+        """Return hit/miss counters and memory usage."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['entries'] = len(self._memory)
+            metrics['memory_bytes'] = self._memory_bytes
+        metrics['max_bytes'] = self.max_bytes
+        metrics['policy'] = self.policy
+        metrics['shared'] = self._shared.name if self._shared is not None else None
+        return metrics
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_content_cache():
+    """Return the process-wide content cache configured from Config."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            shared = None
+            if Config.CACHE_BACKEND == 'redis':
+                from utils.redis_store import RedisContentTier
+                shared = RedisContentTier(Config.REDIS_URL, Config.CONTENT_CACHE_DISK_MAX_BYTES, prefix=Config.REDIS_PREFIX)
+            elif Config.CACHE_BACKEND != 'sqlite':
+                raise ValueError(f"Unknown cache backend '{Config.CACHE_BACKEND}', expected 'sqlite' or 'redis'")
+            _shared_cache = ContentCache(
+                max_bytes=Config.CONTENT_CACHE_MAX_BYTES,
+                policy=Config.CONTENT_CACHE_POLICY,
+                disk_path=Config.CONTENT_CACHE_DISK_PATH or None,
+                disk_max_bytes=Config.CONTENT_CACHE_DISK_MAX_BYTES,
+                shared=shared,
+            )
+        return _shared_cache
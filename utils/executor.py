@@ -0,0 +1,85 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class ExecutorSaturated(Exception):
+    """Raised when a BoundedExecutor has no free worker or queue slot."""
+
+
+class BoundedExecutor:
+    """
+    Thread or process pool with a hard limit on queued work.
+
+    At most ``max_workers`` tasks run at once and at most ``queue_limit`` more
+    may wait. Anything beyond that is rejected immediately with
+    ExecutorSaturated instead of piling up, so callers can shed load.
+    """
+
+    def __init__(self, name, max_workers, queue_limit, kind='thread'):
+        if kind == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        elif kind == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            raise ValueError(f"Unknown executor kind '{kind}', expected 'thread' or 'process'")
+
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._slots = threading.BoundedSemaphore(max_workers + queue_limit)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Schedule ``fn(*args, **kwargs)``.
+
+        Returns:
+            concurrent.futures.Future
+
+        Raises:
+            ExecutorSaturated: All workers are busy and the queue is full
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise ExecutorSaturated(f"The {self.name} pool is saturated, please retry later")
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_flight += 1
+        future.add_done_callback(self._task_done)
+        return future
+
+    def _task_done(self, future):
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+        self._slots.release()
+
+    async def run(self, fn, *args, **kwargs):
+        """Run ``fn`` in the pool and await its result without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'kind': self.kind,
+                'max_workers': self.max_workers,
+                'queue_limit': self.queue_limit,
+                'in_flight': self._in_flight,
+                'completed': self._completed,
+                'rejected': self._rejected,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
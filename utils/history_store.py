@@ -0,0 +1,279 @@
+import json
+import os
+import sqlite3
+import threading
+
+from config import Config
+from utils.metrics import span
+
+
+class HistoryStore:
+    """
+    Append-only research history backed by SQLite in WAL mode.
+
+    Each entry is one row, so appends are O(1) regardless of history size and a
+    crash mid-write can never corrupt earlier entries. Lookups by id, topic and
+    timestamp are served from indexes; nothing is loaded into memory up front.
+
+    Several worker processes can share one database file: SQLite's file locks
+    serialize writers, ids come from AUTOINCREMENT inside the write
+    transaction, and the one-time migrations run under an exclusive lock.
+    """
+
+    # Columns returned by the summary projection (everything but ``results``)
+    SUMMARY_COLUMNS = "id, topic, prompt, timestamp, result_count"
+
+    def __init__(self, path, legacy_json=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        # SQLite's lower() only folds ASCII; topic keys must match str.lower()
+        self._conn.create_function('py_lower', 1, str.lower, deterministic=True)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                topic TEXT NOT NULL,
+                prompt TEXT,
+                timestamp REAL NOT NULL,
+                result_count INTEGER NOT NULL,
+                results TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_history_topic ON history (topic)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp)")
+        # Distinct topics, maintained on every append for autocomplete
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS topics (
+                topic TEXT PRIMARY KEY,
+                topic_key TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                last_researched REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_topics_key ON topics (topic_key)")
+        self._conn.commit()
+
+        if legacy_json:
+            self._import_legacy_json(legacy_json)
+        self._backfill_topics()
+
+    def _backfill_topics(self):
+        """Rebuild the topic index if it does not cover every history row (older databases, imports)."""
+        with self._lock:
+            # Take the write lock before checking, so concurrent workers cannot both rebuild
+            self._conn.execute("BEGIN IMMEDIATE")
+            # Repair keys written by earlier versions with SQLite's ASCII-only lower()
+            self._conn.execute("UPDATE topics SET topic_key = py_lower(topic) WHERE topic_key != py_lower(topic)")
+            indexed = self._conn.execute("SELECT COALESCE(SUM(count), 0) FROM topics").fetchone()[0]
+            if indexed == self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]:
+                self._conn.commit()
+                return
+            self._conn.execute("DELETE FROM topics")
+            self._conn.execute("""
+                INSERT INTO topics (topic, topic_key, count, last_researched)
+                SELECT topic, py_lower(topic), COUNT(*), MAX(timestamp) FROM history GROUP BY topic
+            """)
+            self._conn.commit()
+
+    def _record_topic(self, topic, timestamp):
+        self._conn.execute("""
+            INSERT INTO topics (topic, topic_key, count, last_researched) VALUES (?, ?, 1, ?)
+            ON CONFLICT (topic) DO UPDATE SET
+                count = count + 1,
+                last_researched = MAX(last_researched, excluded.last_researched)
+        """, (topic, topic.lower(), timestamp))
+
+    def _import_legacy_json(self, legacy_json):
+        """One-time import of the old rewrite-everything JSON history file."""
+        if not os.path.exists(legacy_json) or self.count() > 0:
+            return
+
+        try:
+            with open(legacy_json, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not import legacy history from {legacy_json}: {e}")
+            return
+
+        with self._lock:
+            # Re-check under the write lock: another worker may have imported meanwhile
+            self._conn.execute("BEGIN IMMEDIATE")
+            if self._conn.execute("SELECT 1 FROM history LIMIT 1").fetchone():
+                self._conn.rollback()
+                return
+            self._conn.executemany(
+                "INSERT INTO history (id, topic, prompt, timestamp, result_count, results) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        entry['id'],
+                        entry['topic'],
+                        entry.get('prompt'),
+                        entry['timestamp'],
+                        entry.get('result_count', len(entry.get('results', []))),
+                        json.dumps(entry.get('results', [])),
+                    )
+                    for entry in entries
+                ]
+            )
+            self._conn.commit()
+        print(f"Imported {len(entries)} history entries from {legacy_json}")
+
+    @staticmethod
+    def _row_to_entry(row):
+        entry = {
+            'id': row['id'],
+            'topic': row['topic'],
+            'timestamp': row['timestamp'],
+            'result_count': row['result_count'],
+        }
+        if 'results' in row.keys():
+            entry['results'] = json.loads(row['results'])
+        if row['prompt'] is not None:
+            entry['prompt'] = row['prompt']
+        return entry
+
+    def append(self, topic, timestamp, results, prompt=None):
+        """
+        Append a research entry.
+
+        Returns:
+            dict: The stored entry, including its newly allocated id
+        """
+        with span('history_write'), self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO history (topic, prompt, timestamp, result_count, results) VALUES (?, ?, ?, ?, ?)",
+                (topic, prompt, timestamp, len(results), json.dumps(results))
+            )
+            self._record_topic(topic, timestamp)
+            self._conn.commit()
+            entry_id = cursor.lastrowid
+
+        entry = {
+            'id': entry_id,
+            'topic': topic,
+            'timestamp': timestamp,
+            'result_count': len(results),
+            'results': results,
+        }
+        if prompt is not None:
+            entry['prompt'] = prompt
+        return entry
+
+    def get(self, entry_id):
+        """Return the entry with the given id, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM history WHERE id = ?", (entry_id,)).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    @staticmethod
+    def _build_filters(after_id=None, since=None, until=None, topic=None):
+        clauses, params = [], []
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(after_id)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp <= ?")
+            params.append(until)
+        if topic is not None:
+            clauses.append("topic = ?")
+            params.append(topic)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(self, limit=50, offset=0, after_id=None, since=None, until=None, topic=None, include_results=True):
+        """
+        Return one page of entries, oldest first.
+
+        Args:
+            limit: Maximum number of entries to return
+            offset: Number of matching entries to skip (prefer ``after_id`` for deep pages)
+            after_id: Keyset cursor - only entries with a larger id are returned
+            since/until: Inclusive timestamp bounds
+            topic: Exact topic filter
+            include_results: False returns a summary projection without ``results``
+
+        Returns:
+            list of entry dicts
+        """
+        columns = "*" if include_results else self.SUMMARY_COLUMNS
+        where, params = self._build_filters(after_id, since, until, topic)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {columns} FROM history{where} ORDER BY id LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def iter_entries(self, since=None, until=None, topic=None, include_results=True, batch_size=500):
+        """
+        Yield every matching entry, oldest first, reading ``batch_size`` rows at a time.
+
+        The store lock is only held while a batch is read, so long exports do not
+        block concurrent appends.
+        """
+        after_id = None
+        while True:
+            batch = self.query(
+                limit=batch_size,
+                after_id=after_id,
+                since=since,
+                until=until,
+                topic=topic,
+                include_results=include_results
+            )
+            if not batch:
+                return
+            yield from batch
+            after_id = batch[-1]['id']
+
+    def topics(self, prefix=None, limit=None):
+        """
+        Return researched topics in alphabetical order, from the topic index.
+
+        Args:
+            prefix: Only topics starting with this text (case-insensitive)
+            limit: Maximum number of topics to return
+
+        Returns:
+            list of dicts with ``topic``, ``count`` and ``last_researched``
+        """
+        query = "SELECT topic, count, last_researched FROM topics"
+        params = []
+        if prefix:
+            # Range scan on the sorted key index instead of LIKE
+            key = prefix.lower()
+            query += " WHERE topic_key >= ? AND topic_key < ?"
+            params += [key, key + "\U0010FFFF"]
+        query += " ORDER BY topic_key, topic"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_history_store(backend=None):
+    """Open the research history on the configured backend ('sqlite' or 'redis')."""
+    backend = backend or Config.HISTORY_BACKEND
+    if backend == 'redis':
+        from utils.redis_store import RedisHistoryStore
+        return RedisHistoryStore(Config.REDIS_URL, prefix=Config.REDIS_PREFIX, legacy_json=Config.HISTORY_LEGACY_JSON)
+    if backend != 'sqlite':
+        raise ValueError(f"Unknown history backend '{backend}', expected 'sqlite' or 'redis'")
+    return HistoryStore(Config.HISTORY_DB_PATH, legacy_json=Config.HISTORY_LEGACY_JSON)
@@ -0,0 +1,347 @@
+import re
+
+from utils.metrics import span
+
+# Elements whose text is never visible page content
+NON_CONTENT_TAGS = ('script', 'style', 'noscript', 'template', 'svg', 'iframe')
+
+# Elements that never hold article content
+BOILERPLATE_TAGS = NON_CONTENT_TAGS + ('nav', 'header', 'footer', 'aside', 'form', 'button')
+
+# class/id fragments that mark menus, sidebars and other page chrome
+BOILERPLATE_HINT = re.compile(
+    r'(?:^|[\s_-])(?:nav|navbar|navbox|navigation|menu|sidebar|footer|header|breadcrumbs?|toc|'
+    r'cookie|banner|advert|ads|social|share|related|comments?|catlinks|printfooter|'
+    r'mw-jump-link|mw-editsection|vector-header|vector-menu|sitesub)(?:$|[\s_-])',
+    re.IGNORECASE
+)
+
+# Tags that start a new line of text
+BLOCK_TAGS = frozenset((
+    'p', 'div', 'section', 'article', 'main', 'li', 'ul', 'ol', 'dl', 'dt', 'dd', 'table', 'tr',
+    'td', 'th', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'pre', 'blockquote', 'br', 'figcaption',
+))
+
+# Main-content containers, most specific first
+MAIN_TAGS = ('article', 'main')
+
+# A main-content container must hold at least this much text to be trusted
+MIN_MAIN_CHARS = 200
+
+# Paragraphs shorter than this do not vote for a content block
+MIN_PARAGRAPH_CHARS = 25
+
+
+def normalize_text(text):
+    """Strip every line, split multi-headlines on double spaces and drop blank lines."""
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return '\n'.join(chunk for chunk in chunks if chunk)
+
+
+def is_boilerplate(tag, attributes):
+    """Decide from its tag and class/id whether an element is page chrome."""
+    if tag in BOILERPLATE_TAGS:
+        return True
+    hint = f"{attributes.get('class') or ''} {attributes.get('id') or ''} {attributes.get('role') or ''}"
+    return bool(BOILERPLATE_HINT.search(hint)) or (attributes.get('role') in ('navigation', 'banner', 'contentinfo'))
+
+
+def densest_block(paragraphs, text_length, parent_of, key=id):
+    """
+    Readability-style scoring shared by the engines: paragraphs vote for
+    their parent and, with half weight, their grandparent.
+
+    Args:
+        paragraphs: Candidate paragraph nodes (``p``, ``pre``, ``td``)
+        text_length: Returns the stripped text length of a node
+        parent_of: Returns a node's parent, or None
+        key: Returns a stable identity for a node
+
+    Returns:
+        The best-scoring node, or None if no paragraph is long enough
+    """
+    scores = {}
+    nodes = {}
+    for paragraph in paragraphs:
+        length = text_length(paragraph)
+        parent = parent_of(paragraph)
+        if length < MIN_PARAGRAPH_CHARS or parent is None:
+            continue
+        for ancestor, weight in ((parent, 1.0), (parent_of(parent), 0.5)):
+            if ancestor is None:
+                continue
+            node_key = key(ancestor)
+            nodes[node_key] = ancestor
+            scores[node_key] = scores.get(node_key, 0) + length * weight
+    if not scores:
+        return None
+    return nodes[max(scores, key=scores.get)]
+
+
+class LegacyExtractor:
+    """The original whole-page extraction: every text node except scripts and styles."""
+
+    name = 'legacy'
+
+    def extract(self, html):
+        from bs4 import BeautifulSoup
+
+        with span('html_parse'):
+            soup = BeautifulSoup(html, 'html.parser')
+
+        with span('extract'):
+            # Remove script and style elements
+            for script in soup(["script", "style"]):
+                script.extract()
+
+            return normalize_text(soup.get_text())
+
+
+class LxmlExtractor:
+    """
+    libxml2-based extractor.
+
+    The page is fed to a pull parser in chunks and parsing stops as soon as an
+    ``<article>``/``<main>`` block with enough text has been closed, so the
+    footer and trailing sidebars of large pages are never parsed. Pages without
+    such a block fall back to paragraph-density scoring.
+    """
+
+    name = 'lxml'
+    chunk_size = 64 * 1024
+
+    def extract(self, html):
+        from lxml import etree
+
+        with span('html_parse'):
+            parser = etree.HTMLPullParser(events=('end',), tag=MAIN_TAGS)
+            main = None
+            for start in range(0, len(html), self.chunk_size):
+                parser.feed(html[start:start + self.chunk_size])
+                for _, element in parser.read_events():
+                    if len(''.join(element.itertext())) >= MIN_MAIN_CHARS:
+                        main = element
+                        break
+                if main is not None:
+                    break
+            root = parser.close()
+
+        with span('extract'):
+            if main is None:
+                main = root.find('.//*[@role="main"]') if root is not None else None
+            if main is None and root is not None:
+                main = self._densest_block(root)
+            if main is None:
+                return ""
+
+            return normalize_text(self._block_text(main))
+
+    @staticmethod
+    def _attributes(element):
+        return element.attrib
+
+    @staticmethod
+    def _densest_block(root):
+        block = densest_block(
+            root.iter('p', 'pre', 'td'),
+            lambda paragraph: len(''.join(paragraph.itertext()).strip()),
+            lambda element: element.getparent()
+        )
+        if block is None:
+            return root.find('body') if root.find('body') is not None else root
+        return block
+
+    def _block_text(self, element):
+        parts = []
+        self._collect(element, parts, top=True)
+        return ''.join(parts)
+
+    def _collect(self, element, parts, top=False):
+        tag = element.tag if isinstance(element.tag, str) else ''
+        # The chosen block itself is never dropped, only chrome inside it
+        if tag and not top and is_boilerplate(tag, self._attributes(element)):
+            if element.tail:
+                parts.append(element.tail)
+            return
+        block = tag in BLOCK_TAGS
+        if block:
+            parts.append('\n')
+        if tag and element.text:
+            parts.append(element.text)
+        for child in element:
+            self._collect(child, parts)
+        if block:
+            parts.append('\n')
+        if element.tail:
+            parts.append(element.tail)
+
+
+class SelectolaxExtractor:
+    """Lexbor-based extractor (selectolax); the fastest engine when installed."""
+
+    name = 'selectolax'
+
+    def extract(self, html):
+        from selectolax.lexbor import LexborHTMLParser
+
+        with span('html_parse'):
+            tree = LexborHTMLParser(html)
+
+        with span('extract'):
+            return self._extract(tree)
+
+    def _extract(self, tree):
+        # Only invisible elements are dropped up front; chrome such as a <form>
+        # may wrap the whole page, so it is removed inside the chosen block
+        tree.strip_tags(list(NON_CONTENT_TAGS))
+
+        main = None
+        for selector in MAIN_TAGS + ('[role="main"]',):
+            node = tree.css_first(selector)
+            if node is not None and len(node.text(deep=True)) >= MIN_MAIN_CHARS:
+                main = node
+                break
+        if main is None:
+            main = self._densest_block(tree)
+        if main is None:
+            return ""
+
+        chrome = []
+        blocks = []
+        for node in main.traverse():
+            if node is main or not node.tag or node.tag.startswith('-'):
+                continue
+            if is_boilerplate(node.tag, node.attributes):
+                chrome.append(node)
+            elif node.tag in BLOCK_TAGS:
+                blocks.append(node)
+        for node in chrome:
+            node.decompose()
+        # Line breaks around block elements only, so inline links stay in their sentence
+        for node in blocks:
+            if node.parent is not None:
+                node.insert_before('\n')
+                node.insert_after('\n')
+
+        return normalize_text(main.text(separator=''))
+
+    @staticmethod
+    def _densest_block(tree):
+        block = densest_block(
+            tree.css('p, pre, td'),
+            lambda paragraph: len(paragraph.text(deep=True).strip()),
+            lambda node: node.parent,
+            # Node wrappers are recreated on every access; mem_id is stable
+            key=lambda node: node.mem_id
+        )
+        return block if block is not None else tree.body
+
+
+class SoupExtractor:
+    """
+    Pure-Python fallback: BeautifulSoup with the same main-content detection.
+
+    Used only when neither lxml nor selectolax is installed.
+    """
+
+    name = 'bs4'
+
+    def extract(self, html):
+        from bs4 import BeautifulSoup, NavigableString, Tag
+
+        with span('html_parse'):
+            soup = BeautifulSoup(html, 'html.parser')
+
+        with span('extract'):
+            return self._extract(soup, NavigableString, Tag)
+
+    def _extract(self, soup, NavigableString, Tag):
+        main = None
+        for candidate in [soup.find(tag) for tag in MAIN_TAGS] + [soup.find(attrs={'role': 'main'})]:
+            if candidate is not None and len(candidate.get_text()) >= MIN_MAIN_CHARS:
+                main = candidate
+                break
+        if main is None:
+            main = self._densest_soup_block(soup)
+        if main is None:
+            return ""
+
+        parts = []
+
+        def collect(node, top=False):
+            if isinstance(node, NavigableString):
+                if type(node) is NavigableString:
+                    parts.append(str(node))
+                return
+            if not isinstance(node, Tag):
+                return
+            attributes = {key: ' '.join(value) if isinstance(value, list) else value for key, value in node.attrs.items()}
+            # The chosen block itself is never dropped, only chrome inside it
+            if not top and is_boilerplate(node.name, attributes):
+                return
+            block = node.name in BLOCK_TAGS
+            if block:
+                parts.append('\n')
+            for child in node.children:
+                collect(child)
+            if block:
+                parts.append('\n')
+
+        collect(main, top=True)
+        return normalize_text(''.join(parts))
+
+    @staticmethod
+    def _densest_soup_block(soup):
+        block = densest_block(
+            soup.find_all(['p', 'pre', 'td']),
+            lambda paragraph: len(paragraph.get_text().strip()),
+            lambda node: node.parent
+        )
+        return block if block is not None else (soup.body or soup)
+
+
+ENGINES = {
+    'selectolax': SelectolaxExtractor,
+    'lxml': LxmlExtractor,
+    'bs4': SoupExtractor,
+    'legacy': LegacyExtractor,
+}
+
+# Order tried by the "auto" setting
+AUTO_ORDER = ('selectolax', 'lxml', 'bs4')
+
+_ENGINE_MODULES = {
+    'selectolax': 'selectolax.lexbor',
+    'lxml': 'lxml.etree',
+    'bs4': 'bs4',
+    'legacy': 'bs4',
+}
+
+
+def engine_available(name):
+    """Return True if the engine's parser library can be imported."""
+    try:
+        __import__(_ENGINE_MODULES[name])
+        return True
+    except ImportError:
+        return False
+
+
+def get_extractor(name='auto'):
+    """
+    Return an extractor instance.
+
+    Args:
+        name: 'auto' (fastest installed engine), 'selectolax', 'lxml', 'bs4'
+            or 'legacy' (the original whole-page extraction)
+    """
+    if name == 'auto':
+        for candidate in AUTO_ORDER:
+            if engine_available(candidate):
+                return ENGINES[candidate]()
+        raise ImportError("No HTML parser available; install selectolax, lxml or beautifulsoup4")
+
+    if name not in ENGINES:
+        raise ValueError(f"Unknown HTML extractor '{name}', expected 'auto' or one of {list(ENGINES)}")
+    return ENGINES[name]()
@@ -0,0 +1,37 @@
+import threading
+
+
+class Lazy:
+    """
+    Proxy that builds its target on first attribute access.
+
+    Lets module-level components (agents, stores, pools) be declared at import
+    time without paying for their imports, files or sockets until a request
+    actually needs them. Creation is thread-safe and happens at most once.
+
+    The proxy's own names (``instance``, ``created``) are kept distinct from
+    the components' methods, since they shadow attributes of the target.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._value = None
+        self._created = False
+
+    def instance(self):
+        """Return the target, creating it if needed."""
+        if not self._created:
+            with self._lock:
+                if not self._created:
+                    self._value = self._factory()
+                    self._created = True
+        return self._value
+
+    @property
+    def created(self):
+        return self._created
+
+    def __getattr__(self, name):
+        # Only called for attributes the proxy itself does not have
+        return getattr(self.instance(), name)
@@ -0,0 +1,131 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_NAME = 'research_stage_duration_seconds'
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed buckets, Prometheus style."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Yield ``(upper_bound, count)`` pairs, ending with ``('+Inf', total)``."""
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class StageMetrics:
+    """Process-wide registry of per-stage latency histograms."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def snapshot(self):
+        """Return ``{stage: {'count', 'sum'}}`` for every stage seen so far."""
+        with self._lock:
+            return {
+                stage: {'count': histogram.count, 'sum': histogram.sum}
+                for stage, histogram in sorted(self._stages.items())
+            }
+
+    def render(self):
+        """Render the histograms in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent in each stage of the research pipeline.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._stages.items()):
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+class Trace:
+    """Per-request accumulation of stage timings."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def add(self, stage, seconds):
+        with self._lock:
+            entry = self._stages.setdefault(stage, {'count': 0, 'seconds': 0.0})
+            entry['count'] += 1
+            entry['seconds'] += seconds
+
+    def breakdown(self):
+        """Return ``{stage: {'count', 'seconds'}}`` with seconds rounded to milliseconds."""
+        with self._lock:
+            return {
+                stage: {'count': entry['count'], 'seconds': round(entry['seconds'], 3)}
+                for stage, entry in self._stages.items()
+            }
+
+
+metrics = StageMetrics()
+
+_current_trace = ContextVar('research_trace', default=None)
+
+
+def record(stage, seconds):
+    """Record a stage duration in the global histograms and the current trace."""
+    metrics.observe(stage, seconds)
+    current = _current_trace.get()
+    if current is not None:
+        current.add(stage, seconds)
+
+
+@contextmanager
+def span(stage):
+    """Time the enclosed block as one occurrence of ``stage``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def trace():
+    """
+    Collect the spans recorded in this context into a Trace.
+
+    Work handed to other threads only contributes if it runs in a copy of
+    this context (``contextvars.copy_context().run``).
+    """
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
@@ -0,0 +1,153 @@
+import sqlite3
+import threading
+import time
+import zlib
+
+from config import Config
+
+
+class PageCache:
+    """
+    Persistent on-disk cache of fetched pages, keyed by URL.
+
+    Bodies are stored zlib-compressed in a SQLite file together with their
+    ETag/Last-Modified validators. Entries younger than ``ttl`` seconds are
+    served straight from disk; older ones can be revalidated with a
+    conditional request. The total compressed size is capped at ``max_bytes``
+    by evicting the least recently used entries.
+    """
+
+    def __init__(self, path, ttl=3600, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._metrics = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'revalidated': 0,
+            'stores': 0,
+            'evictions': 0,
+        }
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages (accessed_at)")
+        self._conn.commit()
+
+    def get(self, url):
+        """
+        Look up a cached page.
+
+        Returns:
+            dict with ``body``, ``etag``, ``last_modified`` and ``fresh`` keys,
+            or None when the URL is not cached
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                self._metrics['misses'] += 1
+                return None
+
+            body, etag, last_modified, fetched_at = row
+            now = time.time()
+            fresh = now - fetched_at < self.ttl
+            self._metrics['hits' if fresh else 'stale'] += 1
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, url))
+            self._conn.commit()
+
+        return {
+            'body': zlib.decompress(body).decode('utf-8'),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': fresh,
+        }
+
+    def put(self, url, body, etag=None, last_modified=None):
+        """Store (or replace) a page and enforce the size cap."""
+        data = zlib.compress(body.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, body, size, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, data, len(data), etag, last_modified, now, now)
+            )
+            self._metrics['stores'] += 1
+            self._evict()
+            self._conn.commit()
+
+    def mark_revalidated(self, url):
+        """Refresh an entry after the origin answered 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url)
+            )
+            self._conn.commit()
+            self._metrics['revalidated'] += 1
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for url, size in self._conn.execute(
+            "SELECT url, size FROM pages ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= size
+            self._metrics['evictions'] += 1
+
+    def stats(self):
+        """Return hit/miss counters together with the current cache size."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+            metrics = dict(self._metrics)
+
+        lookups = metrics['hits'] + metrics['stale'] + metrics['misses']
+        metrics['hit_ratio'] = round((metrics['hits'] + metrics['revalidated']) / lookups, 3) if lookups else 0.0
+        metrics['entries'] = entries
+        metrics['size_bytes'] = size
+        metrics['max_bytes'] = self.max_bytes
+        return metrics
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_page_cache(backend=None):
+    """Open the page cache on the configured backend ('sqlite' or 'redis')."""
+    backend = backend or Config.CACHE_BACKEND
+    if backend == 'redis':
+        from utils.redis_store import RedisPageCache
+        return RedisPageCache(
+            Config.REDIS_URL,
+            ttl=Config.PAGE_CACHE_TTL,
+            max_bytes=Config.PAGE_CACHE_MAX_BYTES,
+            prefix=Config.REDIS_PREFIX,
+        )
+    if backend != 'sqlite':
+        raise ValueError(f"Unknown cache backend '{backend}', expected 'sqlite' or 'redis'")
+    return PageCache(Config.PAGE_CACHE_PATH, ttl=Config.PAGE_CACHE_TTL, max_bytes=Config.PAGE_CACHE_MAX_BYTES)
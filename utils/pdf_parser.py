@@ -1,32 +1,175 @@
-import PyPDF2
-from io import BytesIO
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config import Config
+from utils.content_cache import ContentCache, get_content_cache
+from utils.executor import ExecutorSaturated
+from utils.metrics import record
+
+# Uploads are copied to disk in blocks of this size, never held in memory whole
+SPOOL_BLOCK_SIZE = 1024 * 1024
+
+@contextmanager
+def _mapped(path):
+    """Memory-map a file read-only (empty files cannot be mapped)."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+def extract_page_range(path, start, end):
+    """
+    Extract the text of pages [start, end) from the PDF at ``path``.
+
+    Module-level so it can be shipped to a process pool; each worker maps the
+    spooled file itself, so no PDF bytes are pickled between processes.
+    """
+    # Imported here so the API does not pay for PyPDF2 until a PDF arrives
+    import PyPDF2
+
+    with _mapped(path) as data:
+        pdf_reader = PyPDF2.PdfReader(data)
+        return [pdf_reader.pages[page_num].extract_text() for page_num in range(start, end)]
+
+def timed_page_range(path, start, end):
+    """
+    Run extract_page_range and also return its duration in seconds.
+
+    Worker processes have their own metrics registry, so the time is measured
+    where the work happens and recorded by the parent.
+    """
+    started = time.perf_counter()
+    pages = extract_page_range(path, start, end)
+    return pages, time.perf_counter() - started
+
+def _recorded(result):
+    pages, seconds = result
+    record('pdf_extract', seconds)
+    return pages
 
 class PDFParser:
-    def __init__(self):
-        """Initialize the PDF parser"""
-        pass
-        
+    def __init__(self, cache=None, process_pool=None, chunk_pages=None):
+        """
+        Initialize the PDF parser
+
+        Args:
+            cache: ContentCache for extracted text (defaults to the shared cache)
+            process_pool: Optional BoundedExecutor used to extract pages off-process
+            chunk_pages: Number of pages handed to a worker at a time
+        """
+        self.cache = cache if cache is not None else get_content_cache()
+        self.process_pool = process_pool
+        self.chunk_pages = chunk_pages or Config.PDF_CHUNK_PAGES
+
+    @contextmanager
+    def _spooled(self, file_stream):
+        """
+        Yield a filesystem path holding the PDF.
+
+        Paths are used as-is; file-like objects are streamed into a temporary
+        file block by block and removed afterwards.
+        """
+        if isinstance(file_stream, (str, os.PathLike)):
+            yield os.fspath(file_stream)
+            return
+
+        spool = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+        try:
+            with spool:
+                shutil.copyfileobj(file_stream, spool, SPOOL_BLOCK_SIZE)
+            yield spool.name
+        finally:
+            os.unlink(spool.name)
+
+    def _iter_path_pages(self, path):
+        """Yield page texts of the PDF at ``path`` in order, extracting chunks in parallel."""
+        import PyPDF2
+
+        with _mapped(path) as data:
+            page_count = len(PyPDF2.PdfReader(data).pages)
+
+        chunks = [
+            (start, min(start + self.chunk_pages, page_count))
+            for start in range(0, page_count, self.chunk_pages)
+        ]
+
+        if self.process_pool is None:
+            for start, end in chunks:
+                yield from _recorded(timed_page_range(path, start, end))
+            return
+
+        def submit(start, end):
+            try:
+                return self.process_pool.submit(timed_page_range, path, start, end), start, end
+            except ExecutorSaturated:
+                # Pool is busy - extract this chunk here when its turn comes
+                # rather than abort a document that may already be half streamed
+                return None, start, end
+
+        # Keep at most one chunk per worker in flight so huge documents do not
+        # flood the pool's queue; results are yielded strictly in page order
+        pending = deque()
+        chunks = iter(chunks)
+        try:
+            for start, end in chunks:
+                pending.append(submit(start, end))
+                if len(pending) >= self.process_pool.max_workers:
+                    break
+            while pending:
+                future, start, end = pending.popleft()
+                yield from _recorded(future.result() if future is not None else timed_page_range(path, start, end))
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    pending.append(submit(*next_chunk))
+        finally:
+            for future, _, _ in pending:
+                if future is not None:
+                    future.cancel()
+
+    def iter_pages(self, file_stream):
+        """
+        Extract text from a PDF file one page at a time
+
+        Args:
+            file_stream: A file-like object or a path to the PDF
+
+        Yields:
+            str: Text of each page, in page order
+        """
+        with self._spooled(file_stream) as path:
+            yield from self._iter_path_pages(path)
+
     def parse_pdf(self, file_stream):
         """
         Extract text from a PDF file
-        
+
         Args:
-            file_stream: A file-like object containing the PDF
-            
+            file_stream: A file-like object or a path to the PDF
+
         Returns:
             str: Extracted text from the PDF
         """
         try:
-            # Create a PDF reader object
-            pdf_reader = PyPDF2.PdfReader(BytesIO(file_stream.read()))
-            
-            # Extract text from all pages
-            text = ""
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n\n"
-            
+            with self._spooled(file_stream) as path:
+                # Re-uploads of the same document are served from the cache
+                with _mapped(path) as data:
+                    key = ContentCache.make_key('pdf_text', data)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached
+
+                # Extract text from all pages
+                text = "".join(page_text + "\n\n" for page_text in self._iter_path_pages(path))
+
+            self.cache.put(key, text)
             return text
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
-            return f"Error extracting text: {str(e)}"
\ No newline at end of file
+            return f"Error extracting text: {str(e)}"
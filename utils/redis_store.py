@@ -0,0 +1,490 @@
+"""
+Redis-backed versions of the history store and caches, for running several
+API workers or replicas against shared state.
+
+Works with any server speaking the Redis protocol (Redis, Valkey, KeyDB,
+Dragonfly...). The ``redis`` client package is only imported when one of
+these backends is configured.
+"""
+import json
+import os
+import threading
+import time
+import zlib
+
+from utils.metrics import span
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_redis(url):
+    """Return a shared, thread-safe client (one connection pool per URL)."""
+    with _clients_lock:
+        client = _clients.get(url)
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("The redis backend needs the 'redis' package: pip install redis") from e
+            client = _clients[url] = redis.Redis.from_url(url)
+        return client
+
+
+# Cache writes run as Lua scripts so that storing an entry, updating the
+# size counter and evicting happen atomically: concurrent workers can never
+# see or leave behind a counter that disagrees with the stored entries.
+#
+# Common arguments: KEYS[1] entry key, KEYS[2] LRU sorted set (entry keys
+# scored by last access), KEYS[3] total size counter; the last ARGV is the
+# size cap. Both scripts return the number of evicted entries.
+_EVICT_LRU = """
+local evicted = 0
+while tonumber(redis.call('GET', KEYS[3]) or '0') > max_bytes do
+    local oldest = redis.call('ZPOPMIN', KEYS[2])
+    if #oldest == 0 then break end
+    local size = redis.call('HGET', oldest[1], 'size')
+    redis.call('DEL', oldest[1])
+    if size then redis.call('DECRBY', KEYS[3], size) end
+    evicted = evicted + 1
+end
+return evicted
+"""
+
+# ARGV: body, size, etag, last_modified, fetched_at, max_bytes
+_PUT_PAGE = """
+local max_bytes = tonumber(ARGV[6])
+local previous = tonumber(redis.call('HGET', KEYS[1], 'size') or '0')
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], 'body', ARGV[1], 'size', ARGV[2], 'etag', ARGV[3],
+           'last_modified', ARGV[4], 'fetched_at', ARGV[5])
+redis.call('ZADD', KEYS[2], ARGV[5], KEYS[1])
+redis.call('INCRBY', KEYS[3], tonumber(ARGV[2]) - previous)
+""" + _EVICT_LRU
+
+# ARGV: value, size, now, max_bytes
+_PUT_CONTENT = """
+local max_bytes = tonumber(ARGV[4])
+-- Values are content-addressed, so an existing entry already holds the same value
+if redis.call('HSETNX', KEYS[1], 'value', ARGV[1]) == 0 then return 0 end
+redis.call('HSET', KEYS[1], 'size', ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[3], KEYS[1])
+redis.call('INCRBY', KEYS[3], ARGV[2])
+""" + _EVICT_LRU
+
+
+class RedisHistoryStore:
+    """
+    Research history shared through Redis; same interface as HistoryStore.
+
+    Ids come from an atomic INCR, so concurrent workers never hand out the
+    same id. Each entry is a hash; sorted sets index entries by id, by
+    timestamp, by topic and topic names lexicographically for prefix lookups.
+    """
+
+    SUMMARY_FIELDS = ('topic', 'prompt', 'timestamp', 'result_count')
+
+    def __init__(self, url, prefix='research-agent', legacy_json=None):
+        self.client = get_redis(url)
+        self.prefix = f"{prefix}:history"
+        self._backfill_times()
+        if legacy_json:
+            self._import_legacy_json(legacy_json)
+
+    def _key(self, *parts):
+        return ':'.join((self.prefix,) + tuple(str(part) for part in parts))
+
+    def _backfill_times(self, batch_size=500):
+        """Index entries written before the timestamp index existed (idempotent)."""
+        if self.client.zcard(self._key('times')) >= self.client.zcard(self._key('ids')):
+            return
+        low = '-inf'
+        while True:
+            ids = [int(member) for member in self.client.zrangebyscore(self._key('ids'), low, '+inf', start=0, num=batch_size)]
+            if not ids:
+                return
+            low = f"({ids[-1]}"
+            pipe = self.client.pipeline(transaction=False)
+            for entry_id in ids:
+                pipe.hget(self._key('entry', entry_id), 'timestamp')
+            scores = {entry_id: float(timestamp) for entry_id, timestamp in zip(ids, pipe.execute()) if timestamp is not None}
+            if scores:
+                self.client.zadd(self._key('times'), scores)
+
+    def _import_legacy_json(self, legacy_json, lock_ttl=300):
+        """
+        One-time import of the old JSON history file, keeping its ids.
+
+        One worker imports under a lock key that expires if it dies; the
+        others wait until the import is marked done, so nobody appends (and
+        allocates ids) before the legacy entries are in place. Everything is
+        written in a single transaction, so a failed import leaves nothing
+        behind and is retried on the next start.
+        """
+        if not os.path.exists(legacy_json):
+            return
+        done_key, lock_key = self._key('legacy_import', 'done'), self._key('legacy_import', 'lock')
+        deadline = time.time() + lock_ttl
+        while not self.client.exists(done_key):
+            if self.client.set(lock_key, 1, nx=True, ex=lock_ttl):
+                try:
+                    self._run_legacy_import(legacy_json, done_key)
+                finally:
+                    self.client.delete(lock_key)
+                return
+            if time.time() > deadline:
+                print(f"Gave up waiting for another worker to import {legacy_json}")
+                return
+            time.sleep(0.1)
+
+    def _run_legacy_import(self, legacy_json, done_key):
+        # Like the SQLite store, only an empty history receives the legacy entries
+        if self.count() > 0:
+            self.client.set(done_key, 1)
+            return
+        try:
+            with open(legacy_json, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not import legacy history from {legacy_json}: {e}")
+            return
+
+        pipe = self.client.pipeline(transaction=True)
+        for entry in entries:
+            self._queue_entry(
+                pipe, entry['id'], entry['topic'], entry['timestamp'], entry.get('results', []), entry.get('prompt')
+            )
+        if entries:
+            pipe.set(self._key('next_id'), max(entry['id'] for entry in entries))
+        pipe.set(done_key, 1)
+        pipe.execute()
+        print(f"Imported {len(entries)} history entries from {legacy_json}")
+
+    def _queue_entry(self, pipe, entry_id, topic, timestamp, results, prompt):
+        """Queue the writes storing one entry and updating every index."""
+        fields = {
+            'topic': topic,
+            'timestamp': repr(timestamp),
+            'result_count': len(results),
+            'results': json.dumps(results),
+        }
+        if prompt is not None:
+            fields['prompt'] = prompt
+        pipe.hset(self._key('entry', entry_id), mapping=fields)
+        pipe.zadd(self._key('ids'), {entry_id: entry_id})
+        pipe.zadd(self._key('times'), {entry_id: timestamp})
+        pipe.zadd(self._key('topic', topic), {entry_id: entry_id})
+        pipe.zadd(self._key('topic_names'), {f"{topic.lower()}\0{topic}": 0})
+        pipe.hincrby(self._key('topic_count'), topic, 1)
+        pipe.zadd(self._key('topic_last'), {topic: timestamp}, gt=True)
+
+    def append(self, topic, timestamp, results, prompt=None):
+        """
+        Append a research entry.
+
+        Returns:
+            dict: The stored entry, including its newly allocated id
+        """
+        with span('history_write'):
+            entry_id = self.client.incr(self._key('next_id'))
+            pipe = self.client.pipeline(transaction=True)
+            self._queue_entry(pipe, entry_id, topic, timestamp, results, prompt)
+            pipe.execute()
+
+        entry = {
+            'id': entry_id,
+            'topic': topic,
+            'timestamp': timestamp,
+            'result_count': len(results),
+            'results': results,
+        }
+        if prompt is not None:
+            entry['prompt'] = prompt
+        return entry
+
+    @staticmethod
+    def _to_entry(entry_id, fields):
+        fields = {key.decode(): value.decode() for key, value in fields.items() if value is not None}
+        entry = {
+            'id': entry_id,
+            'topic': fields['topic'],
+            'timestamp': float(fields['timestamp']),
+            'result_count': int(fields['result_count']),
+        }
+        if 'results' in fields:
+            entry['results'] = json.loads(fields['results'])
+        if 'prompt' in fields:
+            entry['prompt'] = fields['prompt']
+        return entry
+
+    def _load(self, ids, include_results=True):
+        pipe = self.client.pipeline(transaction=False)
+        for entry_id in ids:
+            if include_results:
+                pipe.hgetall(self._key('entry', entry_id))
+            else:
+                pipe.hmget(self._key('entry', entry_id), self.SUMMARY_FIELDS)
+        entries = []
+        for entry_id, fields in zip(ids, pipe.execute()):
+            if not include_results:
+                fields = {name.encode(): value for name, value in zip(self.SUMMARY_FIELDS, fields)}
+            if fields and fields.get(b'topic') is not None:
+                entries.append(self._to_entry(entry_id, fields))
+        return entries
+
+    def get(self, entry_id):
+        """Return the entry with the given id, or None."""
+        entries = self._load([entry_id])
+        return entries[0] if entries else None
+
+    def _time_window_ids(self, since, until, topic=None, after_id=None):
+        """Ids with a timestamp in [since, until] (from the timestamp index), in id order."""
+        ids = [
+            int(member) for member in self.client.zrangebyscore(
+                self._key('times'),
+                '-inf' if since is None else since,
+                '+inf' if until is None else until
+            )
+        ]
+        if after_id is not None:
+            ids = [entry_id for entry_id in ids if entry_id > after_id]
+        if topic is not None and ids:
+            pipe = self.client.pipeline(transaction=False)
+            for entry_id in ids:
+                pipe.zscore(self._key('topic', topic), entry_id)
+            ids = [entry_id for entry_id, score in zip(ids, pipe.execute()) if score is not None]
+        return sorted(ids)
+
+    def query(self, limit=50, offset=0, after_id=None, since=None, until=None, topic=None, include_results=True):
+        """Return one page of entries, oldest first (see HistoryStore.query)."""
+        if since is not None or until is not None:
+            ids = self._time_window_ids(since, until, topic, after_id)
+            return self._load(ids[offset:offset + limit], include_results)
+
+        index = self._key('topic', topic) if topic is not None else self._key('ids')
+        low = f"({after_id}" if after_id is not None else '-inf'
+        ids = [
+            int(member)
+            for member in self.client.zrangebyscore(index, low, '+inf', start=offset, num=limit)
+        ]
+        return self._load(ids, include_results)
+
+    def iter_entries(self, since=None, until=None, topic=None, include_results=True, batch_size=500):
+        """Yield every matching entry, oldest first, ``batch_size`` at a time."""
+        if since is not None or until is not None:
+            # Resolve the time window once instead of once per batch
+            ids = self._time_window_ids(since, until, topic)
+            for start in range(0, len(ids), batch_size):
+                yield from self._load(ids[start:start + batch_size], include_results)
+            return
+
+        after_id = None
+        while True:
+            batch = self.query(
+                limit=batch_size,
+                after_id=after_id,
+                since=since,
+                until=until,
+                topic=topic,
+                include_results=include_results
+            )
+            if not batch:
+                return
+            yield from batch
+            after_id = batch[-1]['id']
+
+    def topics(self, prefix=None, limit=None):
+        """Return researched topics in alphabetical order (see HistoryStore.topics)."""
+        low, high = '-', '+'
+        if prefix:
+            key = prefix.lower().encode('utf-8')
+            # Members are "<lowercased topic>\0<topic>"; 0xff never occurs in UTF-8
+            low, high = b'[' + key, b'(' + key + b'\xff'
+        names = self.client.zrangebylex(
+            self._key('topic_names'), low, high,
+            start=0 if limit is not None else None, num=limit
+        )
+        topics = [name.decode('utf-8').split('\0', 1)[1] for name in names]
+        if not topics:
+            return []
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hmget(self._key('topic_count'), topics)
+        for topic in topics:
+            pipe.zscore(self._key('topic_last'), topic)
+        counts, *last = pipe.execute()
+        return [
+            {'topic': topic, 'count': int(count or 0), 'last_researched': score or 0.0}
+            for topic, count, score in zip(topics, counts, last)
+        ]
+
+    def count(self):
+        return self.client.zcard(self._key('ids'))
+
+    def close(self):
+        # The connection pool is shared with the caches and lives for the process
+        pass
+
+
+class RedisPageCache:
+    """
+    Fetched-page cache shared through Redis; same interface as PageCache.
+
+    Entries are hashes holding the zlib-compressed body and its validators.
+    The total size is tracked in a counter and trimmed to ``max_bytes`` by
+    evicting the least recently used pages.
+    """
+
+    def __init__(self, url, ttl=3600, max_bytes=256 * 1024 * 1024, prefix='research-agent'):
+        self.client = get_redis(url)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.prefix = f"{prefix}:pages"
+        self._put = self.client.register_script(_PUT_PAGE)
+        self._lock = threading.Lock()
+        self._metrics = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'revalidated': 0,
+            'stores': 0,
+            'evictions': 0,
+        }
+
+    def _key(self, url):
+        return f"{self.prefix}:page:{url}"
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._metrics[name] += amount
+
+    def get(self, url):
+        """Look up a cached page (see PageCache.get)."""
+        key = self._key(url)
+        body, etag, last_modified, fetched_at = self.client.hmget(key, ('body', 'etag', 'last_modified', 'fetched_at'))
+        if body is None:
+            self._count('misses')
+            return None
+
+        now = time.time()
+        fresh = now - float(fetched_at) < self.ttl
+        self._count('hits' if fresh else 'stale')
+        # xx: never re-add a page another worker evicted meanwhile
+        self.client.zadd(f"{self.prefix}:lru", {key: now}, xx=True)
+        return {
+            'body': zlib.decompress(body).decode('utf-8'),
+            'etag': etag.decode() if etag else None,
+            'last_modified': last_modified.decode() if last_modified else None,
+            'fresh': fresh,
+        }
+
+    def put(self, url, body, etag=None, last_modified=None):
+        """Store (or replace) a page and enforce the size cap."""
+        key = self._key(url)
+        data = zlib.compress(body.encode('utf-8'))
+        evicted = self._put(
+            keys=[key, f"{self.prefix}:lru", f"{self.prefix}:bytes"],
+            args=[data, len(data), etag or '', last_modified or '', repr(time.time()), self.max_bytes]
+        )
+        self._count('stores')
+        self._count('evictions', evicted)
+
+    def mark_revalidated(self, url):
+        """Refresh an entry after the origin answered 304 Not Modified."""
+        key = self._key(url)
+        now = time.time()
+        if self.client.exists(key):
+            pipe = self.client.pipeline(transaction=True)
+            pipe.hset(key, 'fetched_at', repr(now))
+            pipe.zadd(f"{self.prefix}:lru", {key: now})
+            pipe.execute()
+        self._count('revalidated')
+
+    def stats(self):
+        """Return this worker's hit/miss counters and the shared cache size."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        lookups = metrics['hits'] + metrics['stale'] + metrics['misses']
+        metrics['hit_ratio'] = round((metrics['hits'] + metrics['revalidated']) / lookups, 3) if lookups else 0.0
+        metrics['entries'] = self.client.zcard(f"{self.prefix}:lru")
+        metrics['size_bytes'] = int(self.client.get(f"{self.prefix}:bytes") or 0)
+        metrics['max_bytes'] = self.max_bytes
+        metrics['backend'] = 'redis'
+        return metrics
+
+    def close(self):
+        pass
+
+
+class RedisContentTier:
+    """Shared tier of the ContentCache: compressed values in Redis, LRU-trimmed to ``max_bytes``."""
+
+    name = 'redis'
+
+    def __init__(self, url, max_bytes=512 * 1024 * 1024, prefix='research-agent'):
+        self.client = get_redis(url)
+        self.max_bytes = max_bytes
+        self.prefix = f"{prefix}:content"
+        self._put = self.client.register_script(_PUT_CONTENT)
+
+    def _key(self, key):
+        return f"{self.prefix}:value:{key}"
+
+    def get(self, key):
+        data = self.client.hget(self._key(key), 'value')
+        if data is None:
+            return None
+        self.client.zadd(f"{self.prefix}:lru", {self._key(key): time.time()}, xx=True)
+        return zlib.decompress(data).decode('utf-8')
+
+    def put(self, key, value):
+        data = zlib.compress(value.encode('utf-8'))
+        self._put(
+            keys=[self._key(key), f"{self.prefix}:lru", f"{self.prefix}:bytes"],
+            args=[data, len(data), repr(time.time()), self.max_bytes]
+        )
+
+    def close(self):
+        pass
+
+
+class RedisJobStore:
+    """
+    Research job state and events in Redis; same interface as SQLiteJobStore.
+
+    The state is a JSON string and the events a list, so any worker can serve
+    polls and event streams. Both keys expire ``retention`` seconds after the
+    job's last update, which replaces an explicit purge.
+    """
+
+    def __init__(self, url, retention=3600, prefix='research-agent'):
+        self.client = get_redis(url)
+        self.retention = max(int(retention), 1)
+        self.prefix = f"{prefix}:jobs"
+
+    def _key(self, job_id, *parts):
+        return ':'.join((self.prefix, job_id) + parts)
+
+    def record(self, state, event=None):
+        """Save a job's state and append ``event`` (``{'event', 'data'}``) atomically."""
+        state_key, events_key = self._key(state['job_id']), self._key(state['job_id'], 'events')
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(state_key, json.dumps(state), ex=self.retention)
+        if event is not None:
+            pipe.rpush(events_key, json.dumps(event))
+            pipe.expire(events_key, self.retention)
+        pipe.execute()
+
+    def load(self, job_id):
+        state = self.client.get(self._key(job_id))
+        return json.loads(state) if state is not None else None
+
+    def events(self, job_id, position):
+        return [json.loads(event) for event in self.client.lrange(self._key(job_id, 'events'), position, -1)]
+
+    def purge(self, cutoff):
+        # Keys expire on their own
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,234 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from config import Config
+
+
+class SQLiteJobStore:
+    """
+    Job state and events in a SQLite file, shared by the workers of one machine.
+
+    A job is one row holding its JSON state; its events are numbered rows, so
+    any worker can answer a poll or resume an event stream, whichever worker
+    runs the job.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS research_jobs (
+                id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                finished_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS research_job_events (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                event TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (job_id, position)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_research_jobs_finished ON research_jobs (finished_at)")
+        self._conn.commit()
+
+    def record(self, state, event=None):
+        """Save a job's state and append ``event`` (``{'event', 'data'}``) in one transaction."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO research_jobs (id, state, finished_at) VALUES (?, ?, ?)",
+                    (state['job_id'], json.dumps(state), state['finished_at'])
+                )
+                if event is not None:
+                    self._conn.execute(
+                        """
+                        INSERT INTO research_job_events (job_id, position, event, data)
+                        SELECT ?, COALESCE(MAX(position) + 1, 0), ?, ? FROM research_job_events WHERE job_id = ?
+                        """,
+                        (state['job_id'], event['event'], json.dumps(event['data']), state['job_id'])
+                    )
+
+    def load(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM research_jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def events(self, job_id, position):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT event, data FROM research_job_events WHERE job_id = ? AND position >= ? ORDER BY position",
+                (job_id, position)
+            ).fetchall()
+        return [{'event': event, 'data': json.loads(data)} for event, data in rows]
+
+    def purge(self, cutoff):
+        """Forget jobs that finished before ``cutoff``."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM research_job_events WHERE job_id IN "
+                    "(SELECT id FROM research_jobs WHERE finished_at < ?)",
+                    (cutoff,)
+                )
+                self._conn.execute("DELETE FROM research_jobs WHERE finished_at < ?", (cutoff,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_job_store(backend=None):
+    """Open the job store next to the research history ('sqlite' or 'redis')."""
+    backend = backend or Config.HISTORY_BACKEND
+    if backend == 'redis':
+        from utils.redis_store import RedisJobStore
+        return RedisJobStore(Config.REDIS_URL, retention=Config.RESEARCH_JOB_RETENTION, prefix=Config.REDIS_PREFIX)
+    if backend != 'sqlite':
+        raise ValueError(f"Unknown history backend '{backend}', expected 'sqlite' or 'redis'")
+    return SQLiteJobStore(Config.HISTORY_DB_PATH)
+
+
+class ResearchJob:
+    """
+    State of one background research job, updated from a worker thread.
+
+    Every change is written through to the job store together with its event,
+    so the job can be polled and streamed from any API worker.
+    """
+
+    def __init__(self, store, topic, depth, prompt=None):
+        self.id = uuid.uuid4().hex
+        self.topic = topic
+        self.depth = depth
+        self.prompt = prompt
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.total_sources = None
+        self.results = []
+        self.research_id = None
+        self.error = None
+        self._store = store
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.status in ('completed', 'failed')
+
+    def _emit(self, event, data):
+        self._store.record(self.snapshot(), {'event': event, 'data': data})
+
+    def save(self):
+        with self._lock:
+            self._store.record(self.snapshot())
+
+    def mark_running(self):
+        with self._lock:
+            self.status = 'running'
+            self.started_at = time.time()
+            self._emit('status', {'status': self.status})
+
+    def add_result(self, index, total, result):
+        with self._lock:
+            self.total_sources = total
+            self.results.append({'index': index, **result})
+            self._emit('result', {'index': index, 'total': total, 'result': result})
+
+    def mark_completed(self, response):
+        with self._lock:
+            self.status = 'completed'
+            self.finished_at = time.time()
+            self.research_id = response['research_id']
+            # Replace the completion-order results with the final ordered list
+            self.results = [{'index': i, **item} for i, item in enumerate(response['results'])]
+            self._emit('done', {'research_id': self.research_id, 'result_count': response['result_count']})
+
+    def mark_failed(self, error):
+        with self._lock:
+            self.status = 'failed'
+            self.finished_at = time.time()
+            self.error = str(error)
+            self._emit('error', {'error': self.error})
+
+    def snapshot(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'topic': self.topic,
+            'prompt': self.prompt,
+            'depth': self.depth,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'total_sources': self.total_sources,
+            'completed_sources': len(self.results),
+            'results': sorted(self.results, key=lambda item: item['index']),
+            'research_id': self.research_id,
+            'error': self.error,
+        }
+
+
+class ResearchJobManager:
+    """
+    Runs research jobs in a worker pool and keeps their state for polling.
+
+    ``runner(topic, depth, prompt=None, on_result=None)`` does the actual work and
+    must return the research response (including ``research_id``). Job state
+    lives in ``store`` (see open_job_store), so with several API workers a job
+    can be polled through any of them. Finished jobs are forgotten
+    ``retention`` seconds after they complete.
+    """
+
+    def __init__(self, executor, runner, store, retention=3600):
+        self.executor = executor
+        self.runner = runner
+        self.store = store
+        self.retention = retention
+
+    def submit(self, topic, depth, prompt=None):
+        """
+        Queue a new job.
+
+        Raises:
+            ExecutorSaturated: The worker pool cannot take more work
+        """
+        self.store.purge(time.time() - self.retention)
+        job = ResearchJob(self.store, topic, depth, prompt)
+        # Stored before it is queued, so a poll can never miss a job that exists
+        job.save()
+        try:
+            self.executor.submit(self._run, job)
+        except Exception as e:
+            job.mark_failed(e)
+            raise
+        return job
+
+    def get(self, job_id):
+        """Return the job's status snapshot, or None if it is unknown or expired."""
+        return self.store.load(job_id)
+
+    def events_since(self, job_id, position):
+        """Return the job's events after ``position`` and whether it has finished."""
+        # State first: once it says finished, the final event is already stored
+        state = self.store.load(job_id)
+        done = state is not None and state['status'] in ('completed', 'failed')
+        return self.store.events(job_id, position), done
+
+    def _run(self, job):
+        job.mark_running()
+        try:
+            response = self.runner(job.topic, job.depth, prompt=job.prompt, on_result=job.add_result)
+            job.mark_completed(response)
+        except Exception as e:
+            print(f"Research job {job.id} failed: {str(e)}")
+            job.mark_failed(e)
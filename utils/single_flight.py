@@ -0,0 +1,88 @@
+import threading
+import time
+
+
+class _Call:
+    """One in-flight computation that followers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single computation.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait for it and receive the same result or
+    exception. Successful results are kept for ``ttl`` seconds so repeats
+    within that window are served without running the function again.
+    """
+
+    def __init__(self, ttl=0.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._results = {}  # key -> (expires_at, value)
+        self._metrics = {'executions': 0, 'coalesced': 0, 'cache_hits': 0}
+
+    def do(self, key, fn):
+        """
+        Return ``fn()``, sharing the computation with concurrent callers of ``key``.
+
+        Returns:
+            (value, shared) where shared is True if this caller did not run ``fn``
+        """
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    self._metrics['cache_hits'] += 1
+                    return cached[1], True
+                del self._results[key]
+
+            call = self._calls.get(key)
+            if call is not None:
+                self._metrics['coalesced'] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._metrics['executions'] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and self.ttl > 0:
+                    self._results[key] = (time.monotonic() + self.ttl, call.value)
+                    self._purge()
+            call.done.set()
+
+        return call.value, False
+
+    def _purge(self):
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._results.items() if expires_at <= now]
+        for key in expired:
+            del self._results[key]
+
+    def stats(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['in_flight'] = len(self._calls)
+            metrics['cached'] = len(self._results)
+        metrics['ttl'] = self.ttl
+        return metrics
@@ -0,0 +1,153 @@
+import json
+import os
+import re
+import threading
+import time
+
+TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens of a topic or query."""
+    return TOKEN.findall(text.lower())
+
+
+class TopicIndex:
+    """
+    Immutable token trie over topic phrases.
+
+    Matching walks the trie from every query token, so one pass over the query
+    finds every catalog topic it contains. The cost depends on the query length
+    and the longest topic, not on how many topics the catalog holds.
+    """
+
+    # Marks the end of a complete topic inside the trie
+    _END = object()
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._trie = {}
+        for topic in catalog:
+            tokens = tokenize(topic)
+            if not tokens:
+                continue
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[self._END] = topic
+
+    def match(self, query):
+        """
+        Return the catalog topics found in ``query`` as ``(topic, position, length)``.
+
+        ``position`` is the index of the first query token and ``length`` the
+        number of tokens the topic spans.
+        """
+        tokens = tokenize(query)
+        matches = []
+        for start in range(len(tokens)):
+            node = self._trie
+            for end in range(start, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                topic = node.get(self._END)
+                if topic is not None:
+                    matches.append((topic, start, end - start + 1))
+        return matches
+
+    def sources_for(self, query):
+        """
+        Return ``(topics, sources)`` for every catalog topic contained in ``query``.
+
+        Topics are ranked by specificity (more tokens first, then earlier in the
+        query). Their sources are merged and de-duplicated by link; a source
+        scores ``length / (1 + rank within its topic)`` per topic it appears in,
+        so sources shared by several matched topics rise to the top.
+        """
+        matches = self.match(query)
+        if not matches:
+            return [], []
+
+        ranked = sorted(matches, key=lambda match: (-match[2], match[1]))
+        topics = []
+        scores = {}
+        order = {}
+        for topic, _, length in ranked:
+            if topic in topics:
+                continue
+            topics.append(topic)
+            for rank, source in enumerate(self.catalog[topic]):
+                link = source['link']
+                scores[link] = scores.get(link, 0.0) + length / (1 + rank)
+                order.setdefault(link, (len(order), source))
+
+        merged = sorted(order, key=lambda link: (-scores[link], order[link][0]))
+        return topics, [order[link][1] for link in merged]
+
+
+class TopicCatalog:
+    """
+    Topic -> sources catalog loaded from a JSON file and reloaded when it changes.
+
+    The file maps topic phrases to lists of ``{"link": ..., "title": ...}``
+    sources. It is checked for modifications at most every ``reload_interval``
+    seconds; a file that fails to parse leaves the previous index in place.
+    """
+
+    def __init__(self, path, reload_interval=5.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._index = TopicIndex({})
+        self._mtime = None
+        self._checked_at = 0.0
+        self.reload()
+
+    def reload(self):
+        """Load the catalog file if it changed since the last load."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError as e:
+            print(f"Topic catalog {self.path} is not available: {e}")
+            return False
+
+        if mtime == self._mtime:
+            return False
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                catalog = json.load(f)
+            index = TopicIndex({topic.lower(): sources for topic, sources in catalog.items()})
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Could not load topic catalog {self.path}: {e}")
+            # Do not retry this broken version; wait for the next change
+            with self._lock:
+                self._mtime = mtime
+            return False
+
+        with self._lock:
+            self._index = index
+            self._mtime = mtime
+        print(f"Loaded {len(catalog)} topics from {self.path}")
+        return True
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        self.reload()
+
+    @property
+    def index(self):
+        self._maybe_reload()
+        with self._lock:
+            return self._index
+
+    @property
+    def topics(self):
+        return self.index.catalog
+
+    def sources_for(self, query):
+        return self.index.sources_for(query)
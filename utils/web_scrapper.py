@@ -1,28 +1,221 @@
+import codecs
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+from utils.content_cache import ContentCache, get_content_cache
+from utils.html_extractor import get_extractor
+from utils.metrics import span
+from utils.page_cache import open_page_cache
+from utils.topic_index import TopicCatalog
+
+try:
+    import brotli  # noqa: F401 - only needed so urllib3 can decode "br"
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+# Downloads are read in blocks of this size
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Only this much of the body is inspected to detect its encoding
+CHARSET_SNIFF_BYTES = 4096
+
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.IGNORECASE)
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def _known_encoding(name):
+    try:
+        return codecs.lookup(name).name
+    except (LookupError, TypeError):
+        return None
+
+
+def sniff_charset(head, content_type=None):
+    """
+    Pick the encoding of an HTML body from its Content-Type and first bytes.
+
+    Checks, in order: a byte order mark, the charset parameter of the header,
+    a ``<meta charset>`` declaration in the head, and finally whether the head
+    is valid UTF-8 (otherwise windows-1252, the web's de-facto default).
+    """
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    if content_type:
+        for param in content_type.split(';')[1:]:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'charset':
+                encoding = _known_encoding(value.strip().strip('"\''))
+                if encoding:
+                    return encoding
+
+    match = META_CHARSET.search(head)
+    if match:
+        encoding = _known_encoding(match.group(1).decode('ascii', errors='ignore'))
+        if encoding:
+            return encoding
+
+    try:
+        # Incremental so a character cut at the end of the head is not an error
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'windows-1252'
+
+
+class HostScheduler:
+    """
+    Per-host politeness scheduler.
+    
+    Requests to a host are spaced at least ``min_interval`` seconds apart
+    (with a little jitter), so only repeat hits to the same host are delayed.
+    A host that answers 429/503 with ``Retry-After`` is held back until that
+    deadline has passed.
+    """
+    
+    def __init__(self, min_interval=None, max_retry_after=None):
+        self.min_interval = Config.HOST_MIN_INTERVAL if min_interval is None else min_interval
+        self.max_retry_after = Config.HOST_MAX_RETRY_AFTER if max_retry_after is None else max_retry_after
+        self._lock = threading.Lock()
+        self._next_slot = {}      # host -> earliest time the next request may start
+        self._blocked_until = {}  # host -> Retry-After deadline
+        self._counters = {}       # host -> counters exposed through stats()
+    
+    def _host_counters(self, host):
+        if host not in self._counters:
+            self._counters[host] = {
+                'requests': 0,
+                'delayed': 0,
+                'total_wait': 0.0,
+                'rate_limited': 0,
+                'last_request': None,
+            }
+        return self._counters[host]
+    
+    def acquire(self, url):
+        """
+        Block until a request to the host of ``url`` is allowed.
+        
+        Returns:
+            float: Seconds spent waiting (0.0 for a first-touch host)
+        """
+        host = urlparse(url).netloc.lower()
+        
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now), self._blocked_until.get(host, now))
+            # Reserve the slot before releasing the lock so concurrent callers queue up
+            interval = self.min_interval * random.uniform(1.0, 1.5) if self.min_interval else 0.0
+            self._next_slot[host] = slot + interval
+            
+            counters = self._host_counters(host)
+            counters['requests'] += 1
+            wait = slot - now
+            if wait > 0:
+                counters['delayed'] += 1
+                counters['total_wait'] += wait
+            counters['last_request'] = time.time() + wait
+        
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    def record_response(self, url, status_code, retry_after=None):
+        """Register a response so 429/503 answers back off the host."""
+        if status_code not in (429, 503):
+            return
+        
+        host = urlparse(url).netloc.lower()
+        delay = self._parse_retry_after(retry_after)
+        if delay is None:
+            # No usable hint - back off for a few normal intervals
+            delay = self.min_interval * 5
+        delay = min(delay, self.max_retry_after)
+        
+        with self._lock:
+            deadline = time.monotonic() + delay
+            self._blocked_until[host] = max(self._blocked_until.get(host, 0.0), deadline)
+            self._host_counters(host)['rate_limited'] += 1
+        print(f"Host {host} answered {status_code}; backing off for {delay:.1f}s")
+    
+    @staticmethod
+    def _parse_retry_after(value):
+        """Parse a Retry-After header given in seconds or as an HTTP date."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+    
+    def stats(self):
+        """Return a snapshot of the per-host counters."""
+        with self._lock:
+            return {host: dict(counters) for host, counters in self._counters.items()}
+
+
 class WebScraper:
-    def __init__(self):
-        import requests
-        from bs4 import BeautifulSoup
-        import random
-        import time
-        
-        self.headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        
-        # Dictionary of predefined sources for common topics
-        self.topic_sources = {
-            "artificial intelligence": [
-                {'link': 'https://en.wikipedia.org/wiki/Artificial_intelligence', 'title': 'Artificial intelligence - Wikipedia'},
-                {'link': 'https://www.ibm.com/topics/artificial-intelligence', 'title': 'What is Artificial Intelligence (AI)? | IBM'},
-            ],
-            # Add more predefined topics as needed
-            "car sales": [
-                {'link': 'https://www.statista.com/topics/1487/automotive-industry/', 'title': 'Automotive Industry - Statistics & Facts | Statista'},
-                {'link': 'https://www.ibisworld.com/global/industry-trends/biggest-industries-by-revenue/manufacturing/car-automobile-manufacturing/', 'title': 'Car Manufacturing Industry Trends & Analysis | IBIS World'},
-            ],
-            "sri lanka": [
-                {'link': 'https://en.wikipedia.org/wiki/Sri_Lanka', 'title': 'Sri Lanka - Wikipedia'},
-                {'link': 'https://www.lmd.lk/category/sectors/', 'title': 'Business Sectors in Sri Lanka | LMD'},
-            ],
+    def __init__(self, content_cache=None, extractor=None):
+        # Only delays requests that hit the same host in quick succession
+        self.scheduler = HostScheduler()
+        
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'keep-alive',
         }
+        
+        # Long-lived session so repeat hits to a host reuse a warm keep-alive connection
+        self.timeout = Config.SCRAPER_TIMEOUT
+        self.max_bytes = Config.SCRAPER_MAX_BYTES
+        self.content_types = Config.SCRAPER_CONTENT_TYPES
+        self.adapter = HTTPAdapter(
+            pool_connections=Config.SCRAPER_POOL_CONNECTIONS,
+            pool_maxsize=Config.SCRAPER_POOL_MAXSIZE,
+        )
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+        
+        # Pluggable main-content extraction engine
+        self.extractor = get_extractor(extractor or Config.HTML_EXTRACTOR)
+        
+        # Extracted text keyed by a hash of the raw HTML
+        self.content_cache = content_cache if content_cache is not None else get_content_cache()
+        
+        # Persistent page cache so unchanged pages are not downloaded again
+        self.page_cache = open_page_cache() if Config.PAGE_CACHE_ENABLED else None
+        
+        # Predefined sources for common topics, loaded from an indexed data file
+        self.topic_catalog = TopicCatalog(
+            Config.TOPIC_CATALOG_PATH,
+            reload_interval=Config.TOPIC_CATALOG_RELOAD_INTERVAL
+        )
+    
+    @property
+    def topic_sources(self):
+        """The current topic -> sources mapping."""
+        return self.topic_catalog.topics
     
     def search_web(self, query):
         """
@@ -42,11 +235,11 @@ class WebScraper:
         # Normalize query for dictionary lookup
         query_lower = query.lower()
         
-        # Check if we have predefined sources for this topic
-        for topic, sources in self.topic_sources.items():
-            if topic in query_lower:
-                print(f"Using predefined sources for topic: {topic}")
-                return sources
+        # Find every predefined topic in the query and merge their sources
+        topics, sources = self.topic_catalog.sources_for(query_lower)
+        if sources:
+            print(f"Using predefined sources for topics: {', '.join(topics)}")
+            return sources
         
         # If no predefined sources match, create dynamic search results
         # This is a more general approach based on the user query
@@ -71,56 +264,144 @@ class WebScraper:
     
     def get_page(self, url):
         """Get the HTML content of a webpage"""
-        import requests
-        import time
-        import random
+        page = self.fetch_page(url)
+        return page['body'] if page else None
+    
+    def fetch_page(self, url):
+        """
+        Download a webpage as text, streaming at most ``max_bytes`` of its body.
         
+        Returns:
+            dict with ``body`` and ``truncated`` (the body was cut off at the
+            size cap), or None if the page could not be fetched or is not HTML
+        """
         try:
-            # Add a short delay to avoid being blocked
-            time.sleep(random.uniform(1, 3))
+            # A fresh cache hit skips both the network and the politeness delay
+            cached = self.page_cache.get(url) if self.page_cache else None
+            if cached and cached['fresh']:
+                return {'body': cached['body'], 'truncated': False}
             
-            # Send the request
-            response = requests.get(url, headers=self.headers, timeout=10)
+            # Revalidate stale entries with a conditional request
+            headers = {}
+            if cached:
+                if cached['etag']:
+                    headers['If-None-Match'] = cached['etag']
+                if cached['last_modified']:
+                    headers['If-Modified-Since'] = cached['last_modified']
+            
+            # Wait only if this host was contacted recently
+            with span('politeness_wait'):
+                self.scheduler.acquire(url)
             
-            # Check if the request was successful
-            if response.status_code == 200:
-                return response.text
-            else:
-                print(f"Failed to retrieve page: {url}, Status code: {response.status_code}")
-                return None
+            # Send the request
+            with span('fetch'):
+                response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+                with response:
+                    page = self._read_response(url, response, cached)
+            return page
                 
         except Exception as e:
             print(f"Error fetching URL {url}: {str(e)}")
             return None
     
+    def _read_response(self, url, response, cached):
+        self.scheduler.record_response(url, response.status_code, response.headers.get('Retry-After'))
+        
+        if response.status_code == 304 and cached:
+            self.page_cache.mark_revalidated(url)
+            return {'body': cached['body'], 'truncated': False}
+        
+        # Check if the request was successful
+        if response.status_code != 200:
+            print(f"Failed to retrieve page: {url}, Status code: {response.status_code}")
+            return None
+        
+        # Reject binaries and other non-HTML before reading any of the body
+        content_type = response.headers.get('Content-Type', '')
+        media_type = content_type.split(';', 1)[0].strip().lower()
+        if media_type and media_type not in self.content_types:
+            print(f"Skipping {url}: unsupported content type '{media_type}'")
+            return None
+        
+        body, truncated = self._read_body(response)
+        if truncated:
+            print(f"Truncated {url} at {self.max_bytes} bytes")
+        text = body.decode(sniff_charset(body[:CHARSET_SNIFF_BYTES], content_type), errors='replace')
+        
+        # Partial pages are not cached, so a later fetch can still see the whole page
+        if self.page_cache and not truncated:
+            self.page_cache.put(
+                url,
+                text,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+            )
+        return {'body': text, 'truncated': truncated}
+    
+    def _read_body(self, response):
+        """Read the (decompressed) body up to ``max_bytes``; returns (bytes, truncated)."""
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            if size + len(chunk) > self.max_bytes:
+                chunks.append(chunk[:self.max_bytes - size])
+                return b''.join(chunks), True
+            chunks.append(chunk)
+            size += len(chunk)
+        return b''.join(chunks), False
+    
+    def pool_stats(self):
+        """Return connection pool usage per host, for tuning the pool sizes."""
+        pools = {}
+        pool_manager = self.adapter.poolmanager
+        for key in list(pool_manager.pools.keys()):
+            pool = pool_manager.pools.get(key)
+            if pool is None:
+                continue
+            pools[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests,
+                # The pool queue is pre-filled with None placeholders; count real sockets only
+                'idle_connections': sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0,
+                'max_size': Config.SCRAPER_POOL_MAXSIZE,
+            }
+        return pools
+    
+    def stats(self):
+        """Return scraper diagnostics (politeness, pool and cache counters)."""
+        return {
+            'hosts': self.scheduler.stats(),
+            'pools': self.pool_stats(),
+            'page_cache': self.page_cache.stats() if self.page_cache else None,
+            'content_cache': self.content_cache.stats(),
+        }
+    
+    def close(self):
+        """Release pooled connections and the page cache."""
+        self.session.close()
+        if self.page_cache:
+            self.page_cache.close()
+    
     def extract_main_content(self, html):
         """Extract the main content from an HTML page"""
-        from bs4 import BeautifulSoup
-        
         if not html:
             return "No content available."
-            
+        
+        # Unchanged HTML is only ever parsed once
+        key = ContentCache.make_key('html_text', html, self.extractor.name)
+        cached = self.content_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        text = self._extract_main_content(html)
+        if text != "Error extracting content.":
+            self.content_cache.put(key, text)
+        return text
+    
+    def _extract_main_content(self, html):
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.extract()
-            
-            # Get text
-            text = soup.get_text()
-            
-            # Break into lines and remove leading and trailing space on each
-            lines = (line.strip() for line in text.splitlines())
-            
-            # Break multi-headlines into a line each
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            
-            # Drop blank lines
-            text = '\n'.join(chunk for chunk in chunks if chunk)
-            
-            return text
+            return self.extractor.extract(html)
             
         except Exception as e:
             print(f"Error extracting content: {str(e)}")
-            return "Error extracting content."
\ No newline at end of file
+            return "Error extracting content."